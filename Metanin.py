@@ -1,10 +1,22 @@
+import os
+
 import streamlit as st
 import pandas as pd
-from PIL import Image
-import requests
-from io import BytesIO
 import base64
 
+from asset_cache import asset_cache
+from build_store import LIST_LIMIT, build_library
+from engine import ATTRIBUTES, BASE_MIN, MAX_LEVEL, MAX_POINTS, cached_evaluate_build
+from game_data import available_versions, default_version, load_error, load_game_data
+from instrumentation import (
+    CAPTURE_KINDS, METRICS_PORT, Capture, debug_enabled, metrics, serve_metrics, stop_stale_captures
+)
+from optimizer import OBJECTIVES, optimize_builds
+from pareto import OBJECTIVES as PARETO_OBJECTIVES, explorer
+from render import RENDER_MODES, label_with_emoji, technique_table
+from requirements import requirement_index, solve_requirements
+from rotation import chakra_pool, loadout_indices, simulate_rotation
+
 # ===== CONFIGURAÇÃO INICIAL =====
 st.set_page_config(
     page_title="Nin0ff-Meta",
@@ -12,91 +24,83 @@ st.set_page_config(
     layout="wide"
 )
 
+# Tempos por seção (ver instrumentation); a captura de perfil vale só para este rerun
+rerun = metrics.rerun()
+try:
+    serve_metrics()
+except OSError as e:
+    st.warning(f"Endpoint de métricas desativado: porta {METRICS_PORT} indisponível ({e.strerror})")
+# Um rerun interrompido por widget (RerunException/StopException) não chega ao stop() no fim do
+# script; o próximo rerun da sessão (na mesma thread) desliga a captura que ficou ligada
+stale_capture = st.session_state.pop("capture_active", None)
+if stale_capture is not None:
+    stale_capture.cancel()
+stop_stale_captures()
+capture_kind = st.session_state.pop("capture_kind", None)
+capture = Capture(capture_kind).start() if capture_kind else None
+if capture is not None:
+    st.session_state["capture_active"] = capture
+
 # ===== CONSTANTES =====
-MAX_POINTS = 285
 SIGN_EMOJIS = {
     "Capricorn": "♑", "Aquarius": "♒", "Pisces": "♓", "Aries": "♈",
     "Taurus": "♉", "Gemini": "♊", "Cancer": "♋", "Leo": "♌",
     "Virgo": "♍", "Libra": "♎", "Scorpio": "♏", "Saggitarius": "♐"
 }
 
-EMOJI_MAP = {
-    "Fire": "🔥", "Wind": "🍃", "Lightning": "⚡", "Earth": "🪨",
-    "Water": "💧", "Medical": "🧪", "Weapon": "🗡️", "Taijutsu": "🥋"
-}
-COLORS = {
-    "Fire": "#FF5555", "Wind": "#55FF55", "Lightning": "#FFFF55",
-    "Earth": "#FFAA55", "Water": "#55AAFF", "Medical": "#55FFAA", 
-    "Weapon": "#AAAAAA", "Taijutsu": "#AA55FF", "Common": "#DDDDDD"
-}
-ELEMENTS = list(EMOJI_MAP.keys())
-
 IMAGE_URL = "https://via.placeholder.com/80"  # Substitua pelo link desejado
 
 # ===== FUNÇÕES =====
 def label_charm(name):
     return f"{SIGN_EMOJIS.get(name, '')} {name}" if name != "Nenhum" else "Nenhum"
 
-def label_with_emoji(name):
-    return f"{EMOJI_MAP.get(name, '')} {name}"
-
-def calculate_level(total_points):
-    level, points_needed = 1, 0
-    while level <= 60 and points_needed <= MAX_POINTS:
-        points_per_level = 5 if level <= 50 else 4
-        points_needed += points_per_level
-        if total_points >= points_needed and points_needed <= MAX_POINTS:
-            level += 1
-        else:
-            break
-    return min(level, 60)
-
-def calculate_available_points(level):
-    return (level - 1) * 5 if level <= 50 else (50 * 5) + ((level - 50) * 4)
-
-def apply_bonuses(base, charm, guild_level, attr, faction_bonus):
-    value_with_guild = base * (1 + guild_level * 0.01)
-    charm_bonuses = {
-        "Capricorn": {"FRT": 5}, "Aquarius": {"INT": 5}, "Leo": {"AGI": 5},
-        "Saggitarius": {a: 1 for a in ["STR", "FRT", "INT", "AGI", "CHK"]},
-        "Virgo": {"CHK": 5}, "Cancer": {"STR": 1}, "Pisces": {a: 1 for a in ["STR", "FRT", "INT", "AGI", "CHK"]},
-        "Libra": {"INT": 0.05}, "Scorpio": {"AGI": 1}, "Gemini": {"CHK": 1}, "Taurus": {"FRT": 1}
-    }
-    bonus = charm_bonuses.get(charm, {}).get(attr, 0)
-    total_bonus = int(value_with_guild * (1 + bonus)) if isinstance(bonus, float) else int(value_with_guild + bonus)
-    return total_bonus + faction_bonus
-
-def style_element(row):
-    nome_elemento = row["Elemento"].split(" ", 1)[-1]  # Remove emoji
-    color = COLORS.get(nome_elemento, "#FFFFFF")
-    return [f"background-color: {color}; color: #000000" for _ in row]
+def label_faction(name):
+    return f"{name} (+{data.faction_bonuses[name]})" if data.faction_bonuses[name] else name
 
 def style_weapon(row):
     meets_req = row["Atende Requisitos"]
     color = "#55FF55" if meets_req else "#FF5555"
     return [f"background-color: {color}; color: #000000" for _ in row]
 
-# ===== BANCO DE DADOS DE ARMAS =====
-weapons_db = {
-    "Kunai Dagger": {
-        "base_damage": 9,
-        "scaling": "STR",
-        "requirements": {"INT": 10},
-        "description": "Kunai padrão para combate à distância"
-    },
-    "Poison-Laced Kunai": {
-        "base_damage": 9,
-        "scaling": "STR",
-        "requirements": {"INT": 10},
-        "description": "Envenena o alvo ao acertar"
-    },
-    "Wooden Katana": {
-        "base_damage": 2,
-        "scaling": "STR",
-        "requirements": {"STR": 12},
-        "description": "Katana de madeira para treinamento"
-    }
-}
+# ===== ENTRADAS MEMOIZADAS =====
+ATTRIBUTE_KEYS = {attr: f"{attr.lower()}_base" for attr in ATTRIBUTES}
+# Fragmentos que dependem dos atributos base (ver SEÇÕES ISOLADAS); as tabelas de técnicas
+# só entram quando o atributo alterado escala alguma técnica delas ou o nível muda
+BUILD_FRAGMENTS = ["status", "atributos", "curva_dps", "rotacao", "versoes"]
+
+def current_build(selection):
+    config = {attr: st.session_state.get(key, BASE_MIN) for attr, key in ATTRIBUTE_KEYS.items()}
+    config.update({key: selection[key] for key in ("primary", "secondary", "charm", "guild_level", "faction", "weapon")})
+    with metrics.span("engine.evaluate_build"):
+        return config, cached_evaluate_build(config, data=selection["data"])
+
+def build_view(selection, build):
+    # (vetor de atributos finais, nível, nível máximo das técnicas listadas)
+    attribute_key = tuple(build["attributes"][attr] for attr in ATTRIBUTES)
+    return attribute_key, build["level"], build["level"] if selection["only_unlocked"] else None
+
+def scaling_attributes(data, elements):
+    techniques = data.techniques
+    return {ATTRIBUTES[i] for i in techniques.scaling_idx[techniques.indices(*elements)] if i >= 0}
+
+def rerun_build_sections(attr):
+    selection = st.session_state.get("selection")
+    if selection is None:
+        return  # Primeira execução: a página inteira ainda vai rodar
+    sections = list(BUILD_FRAGMENTS)
+    _, build = current_build(selection)
+    level_changed = build["level"] != st.session_state.get("shown_level")
+    if level_changed or attr in scaling_attributes(selection["data"], (selection["primary"], selection["secondary"])):
+        sections.append("tecnicas")
+    if st.session_state.get("show_common") and (
+            (level_changed and selection["only_unlocked"]) or attr in scaling_attributes(selection["data"], ("Common",))):
+        sections.append("comuns")
+    st.session_state["partial_rerun"] = True
+    st.rerun(sections)
+
+def rerun_common_section():
+    st.session_state["partial_rerun"] = True
+    st.rerun(["comuns"])
 
 # ===== INTERFACE PRINCIPAL =====
 st.title("🔥 Nin0ff-Meta Calculator")
@@ -105,55 +109,61 @@ st.title("🔥 Nin0ff-Meta Calculator")
 with st.sidebar:
     st.header("⚙️ Configuração", divider="red")
 
+    # Versão dos dados do jogo (data/<versão>.json); carregada uma vez por processo
+    data_versions = available_versions()
+    data_version = st.selectbox("Versão dos dados", data_versions,
+                                index=data_versions.index(default_version()))
+    data = load_game_data(data_version)
+    data_error = load_error(data_version)
+    if data_error:
+        # Edição quebrada do arquivo: load_game_data segue com a última versão válida
+        st.warning(f"Arquivo de dados {data_version} com erro, usando a última versão válida: {data_error}")
+
     # Faction Bonuses
     st.subheader("🏛️ Faction Bonuses")
     faction = st.radio("Selecione sua facção:", 
-                      ["Nenhuma", "Akatsuki (+25)", "Kage (+20)", "Leaf 12 Guardian (+10)"],
+                      list(data.faction_bonuses.keys()),
+                      format_func=label_faction,
                       index=0)
-    
-    faction_bonus = 0
-    if "Akatsuki" in faction:
-        faction_bonus = 25
-    elif "Kage" in faction:
-        faction_bonus = 20
-    elif "Leaf" in faction:
-        faction_bonus = 10
 
     cols = st.columns(2)
     with cols[0]:
-        primary = st.selectbox("Primário", ELEMENTS, format_func=label_with_emoji)
+        primary = st.selectbox("Primário", data.elements, format_func=label_with_emoji)
     with cols[1]:
-        available_secondary = [e for e in ELEMENTS if e != primary]
+        available_secondary = [e for e in data.elements if e != primary]
         secondary = st.selectbox("Secundário", available_secondary, format_func=label_with_emoji)
 
-    charms = ["Nenhum"] + list(SIGN_EMOJIS.keys())
-    charm = st.selectbox("Charm", charms, index=0, format_func=label_charm)
+    charm = st.selectbox("Charm", data.charms, index=0, format_func=label_charm)
 
     guild_level = st.slider("Guild Level Status", 0, 10, 0)
 
-    # Cálculos de pontos
-    total_spent = sum(attributes_base.values()) - (5 * 5) if 'attributes_base' in locals() else 0
-    level = calculate_level(total_spent)
-    total_available = calculate_available_points(level)
-    remaining_points = max(0, total_available - total_spent)
-
-    st.header("📊 Status", divider="gray")
-    st.metric("Pontos Gastos", f"{total_spent}/{MAX_POINTS}")
-    st.metric("Pontos Disponíveis", remaining_points)
-    st.metric("Nível", level)
-
-    if total_spent > MAX_POINTS:
-        st.error(f"Limite de {MAX_POINTS} pontos excedido!")
-    elif total_spent > total_available:
-        st.warning("Pontos gastos excedem os disponíveis para este nível")
+    # Preenchido depois que os atributos base são lidos
+    status_container = st.container()
 
     # Seletor de armas
     st.header("⚔️ Seleção de Arma", divider="gray")
-    weapon_list = list(weapons_db.keys())
+    weapon_list = list(data.weapons_db.keys())
     selected_weapon = st.selectbox("Escolha sua arma:", weapon_list)
     
     # Botão para mostrar técnicas comuns
-    show_common = st.toggle("Mostrar Técnicas Comuns", value=False)
+    st.toggle("Mostrar Técnicas Comuns", value=False, key="show_common", on_change=rerun_common_section)
+    only_unlocked = st.toggle("Somente técnicas do meu nível", value=False)
+    render_mode = st.radio("Tabelas", list(RENDER_MODES.keys()), format_func=RENDER_MODES.get, horizontal=True)
+
+rerun.mark("sidebar")
+
+# ===== SEÇÕES ISOLADAS (FRAGMENTOS) =====
+# A sidebar de configuração reexecuta a página toda. Mudar um atributo base reexecuta só os
+# fragmentos de BUILD_FRAGMENTS, que leem os atributos do session_state e a build memoizada.
+selection = {
+    "data": data, "data_version": data_version, "primary": primary, "secondary": secondary,
+    "charm": charm, "guild_level": guild_level, "faction": faction, "weapon": selected_weapon,
+    "render_mode": render_mode, "only_unlocked": only_unlocked,
+}
+st.session_state["selection"] = selection
+# Os callbacks que reexecutam só fragmentos ligam partial_rerun; o modo automático das tabelas
+# usa a versão sem Styler nesses reruns e volta às cores no próximo rerun completo
+st.session_state["partial_rerun"] = False
 
 # ===== SIDEBAR DIREITA (ATRIBUTOS) =====
 with st.sidebar:
@@ -167,259 +177,415 @@ with right_sidebar:
     # Subheader para Atributos Base
     st.subheader("Atributos Base")
     cols = st.columns(2)
-    attributes_base = {}
     with cols[0]:
-        attributes_base["STR"] = st.number_input("STR", min_value=5, value=5, step=1, key="str_base")
-        attributes_base["FRT"] = st.number_input("FRT", min_value=5, value=5, step=1, key="frt_base")
-        attributes_base["INT"] = st.number_input("INT", min_value=5, value=5, step=1, key="int_base")
+        st.number_input("STR", min_value=5, value=5, step=1, key="str_base", on_change=rerun_build_sections, args=("STR",))
+        st.number_input("FRT", min_value=5, value=5, step=1, key="frt_base", on_change=rerun_build_sections, args=("FRT",))
+        st.number_input("INT", min_value=5, value=5, step=1, key="int_base", on_change=rerun_build_sections, args=("INT",))
     with cols[1]:
-        attributes_base["AGI"] = st.number_input("AGI", min_value=5, value=5, step=1, key="agi_base")
-        attributes_base["CHK"] = st.number_input("CHK", min_value=5, value=5, step=1, key="chk_base")
-
-    # Calcular atributos finais
-    if 'attributes_base' in locals():
-        attributes = {
-            attr: apply_bonuses(val, charm, guild_level, attr, faction_bonus)
-            for attr, val in attributes_base.items()
-        }
-    else:
-        attributes = {a: 5 for a in ["STR", "FRT", "INT", "AGI", "CHK"]}
-
-    # Subheader para Atributos Finais (mais compacto)
-    st.subheader("Atributos Finais")
-    final_cols = st.columns(2)
-    with final_cols[0]:
-        st.metric("STR", attributes["STR"])
-        st.metric("FRT", attributes["FRT"])
-        st.metric("INT", attributes["INT"])
-    with final_cols[1]:
-        st.metric("AGI", attributes["AGI"])
-        st.metric("CHK", attributes["CHK"])
-
-    # Verifica requisitos da arma
-    if selected_weapon:
-        weapon_data = weapons_db[selected_weapon]
-        meets_requirements = all(attributes.get(req, 0) >= val for req, val in weapon_data["requirements"].items())
-        
-        if meets_requirements:
-            st.success("✅ Requisitos atendidos")
-        else:
-            st.error("❌ Requisitos não atendidos")
-        
-        st.write(f"**Dano Base:** {weapon_data['base_damage']}")
-        st.write(f"**Escalonamento:** {weapon_data['scaling']}")
-        st.write(f"**Descrição:** {weapon_data['description']}")
-
-# ===== TÉCNICAS =====
-techniques_db = {
-    "Fire": {
-        "Phoenix Fireball Technique": {"base": 25, "scaling": "INT", "cost": 10, "cooldown": 12, "level": 10},
-        "Big Flame Bullet Technique": {"base": 30, "scaling": "INT", "cost": 15, "cooldown": 14, "level": 15},
-        "Fire Wall Technique": {"base": 28, "scaling": "INT", "cost": 12, "cooldown": 10, "level": 20},
-        "Combusting Vortex": {"base": 35, "scaling": "INT", "cost": 18, "cooldown": 16, "level": 25},
-        "Great Fireball Technique": {"base": 40, "scaling": "INT", "cost": 25, "cooldown": 20, "level": 30},
-        "Flame Dragon Technique": {"base": 48, "scaling": "INT", "cost": 30, "cooldown": 24, "level": 35}
-    },
-    "Wind": {
-        # INT Wind
-        "Wind Shuriken Technique": {"base": 22, "scaling": "INT", "cost": 8, "cooldown": 10, "level": 10},
-        "Wind Scythe Technique": {"base": 26, "scaling": "INT", "cost": 12, "cooldown": 12, "level": 15},
-        "Drilling Air Bullet Technique": {"base": 30, "scaling": "INT", "cost": 14, "cooldown": 14, "level": 20},
-        "Hurricane Blade Technique": {"base": 34, "scaling": "INT", "cost": 17, "cooldown": 15, "level": 25},
-        "Vacuum Sphere Technique": {"base": 38, "scaling": "INT", "cost": 20, "cooldown": 17, "level": 30},
-        "Wind Claw Technique": {"base": 42, "scaling": "INT", "cost": 23, "cooldown": 18, "level": 35},
-
-        # STR Wind (Fan Style)
-        "Slashing Tornado Technique": {"base": 28, "scaling": "STR", "cost": 12, "cooldown": 11, "level": 10},
-        "Task of the Dragon Technique": {"base": 32, "scaling": "STR", "cost": 15, "cooldown": 13, "level": 15},
-        "Slicing Wind Technique": {"base": 36, "scaling": "STR", "cost": 18, "cooldown": 15, "level": 20},
-        "Wind Mask Technique": {"base": 40, "scaling": "STR", "cost": 22, "cooldown": 16, "level": 25},
-        "Wind Barrage Technique": {"base": 44, "scaling": "STR", "cost": 25, "cooldown": 18, "level": 30},
-        "Wind Cyclone": {"base": 50, "scaling": "STR", "cost": 30, "cooldown": 20, "level": 35}
-    },
-    "Lightning": {
-        "Lightning Senbon Technique": {"base": 24, "scaling": "INT", "cost": 10, "cooldown": 10, "level": 10},
-        "Lightning Spear Technique": {"base": 28, "scaling": "INT", "cost": 14, "cooldown": 12, "level": 15},
-        "Lightning Cutter Technique": {"base": 32, "scaling": "INT", "cost": 17, "cooldown": 14, "level": 20},
-        "Feast of Lightning Technique": {"base": 36, "scaling": "INT", "cost": 20, "cooldown": 15, "level": 25},
-        "Lightning Current Technique": {"base": 40, "scaling": "INT", "cost": 24, "cooldown": 17, "level": 30},
-        "Binding Pillars Techinque": {"base": 46, "scaling": "INT", "cost": 28, "cooldown": 20, "level": 35}
-    },
-    "Earth": {
-        "Earth Pillar Technique": {"base": 26, "scaling": "STR", "cost": 12, "cooldown": 11, "level": 10},
-        "Earth Prison Technique": {"base": 30, "scaling": "STR", "cost": 14, "cooldown": 13, "level": 15},
-        "Earth Split Technique": {"base": 34, "scaling": "STR", "cost": 17, "cooldown": 15, "level": 20},
-        "Ravaging Earth Spikes Technique": {"base": 38, "scaling": "STR", "cost": 20, "cooldown": 17, "level": 25},
-        "Mud River Technique": {"base": 42, "scaling": "STR", "cost": 24, "cooldown": 18, "level": 30},
-        "Earth Wall Technique": {"base": 48, "scaling": "STR", "cost": 28, "cooldown": 20, "level": 35}
-    },
-    "Water": {
-        # INT Water
-        "Water Bullet Technique": {"base": 22, "scaling": "INT", "cost": 9, "cooldown": 10, "level": 10},
-        "Water Slash Technique": {"base": 26, "scaling": "INT", "cost": 12, "cooldown": 12, "level": 15},
-        "Colliding Wave Technique": {"base": 30, "scaling": "INT", "cost": 15, "cooldown": 14, "level": 20},
-        "Water Substitution Technique": {"base": 34, "scaling": "INT", "cost": 18, "cooldown": 15, "level": 25},
-        "Water Prison Technique": {"base": 38, "scaling": "INT", "cost": 22, "cooldown": 17, "level": 30},
-        "Great Water Shark Technique": {"base": 44, "scaling": "INT", "cost": 26, "cooldown": 20, "level": 35},
-
-        # STR Water
-        "Soap Bubble Technique": {"base": 24, "scaling": "STR", "cost": 10, "cooldown": 10, "level": 10},
-        "Bubble Solution Spitting Technique": {"base": 28, "scaling": "STR", "cost": 13, "cooldown": 12, "level": 15},
-        "Bubble Spray Technique": {"base": 32, "scaling": "STR", "cost": 16, "cooldown": 13, "level": 20},
-        "Bubble Clone Technique": {"base": 36, "scaling": "STR", "cost": 20, "cooldown": 15, "level": 25},
-        "Soap Explosion Technique": {"base": 40, "scaling": "STR", "cost": 23, "cooldown": 17, "level": 30},
-        "Great Bubble Shark Technique": {"base": 46, "scaling": "STR", "cost": 27, "cooldown": 20, "level": 35}
-    },
-    "Medical": {
-        "Treat Wounds Technique": {"base": 10, "scaling": "INT", "cost": 5, "cooldown": 10, "level": 10},
-        "Poison Senbon Technique": {"base": 18, "scaling": "INT", "cost": 7, "cooldown": 12, "level": 15},
-        "Poison Scalpel Technique": {"base": 22, "scaling": "INT", "cost": 9, "cooldown": 14, "level": 20},
-        "Mystical Palm Technique": {"base": 26, "scaling": "INT", "cost": 11, "cooldown": 15, "level": 25},
-        "Status Extraction Technique": {"base": 30, "scaling": "INT", "cost": 14, "cooldown": 17, "level": 30},
-        "Chakra Scalpel Technique": {"base": 34, "scaling": "INT", "cost": 16, "cooldown": 20, "level": 35},
-        "Antibodies Activation": {"base": 38, "scaling": "INT", "cost": 18, "cooldown": 22, "level": 35},
-        "Poison Cloud Technique": {"base": 42, "scaling": "INT", "cost": 20, "cooldown": 24, "level": 35},
-        "Cell Regeneration Activation": {"base": 46, "scaling": "INT", "cost": 23, "cooldown": 26, "level": 35},
-        "Cursed Seal Activation": {"base": 50, "scaling": "INT", "cost": 26, "cooldown": 28, "level": 35},
-        "Chakra Transfer Technique": {"base": 54, "scaling": "INT", "cost": 28, "cooldown": 30, "level": 35}
-    },
-    "Weapon": {
-        # INT
-        "Explosive Kunai Technique": {"base": 20, "scaling": "INT", "cost": 10, "cooldown": 10, "level": 10},
-        "Triple Explosive Tag Technique": {"base": 24, "scaling": "INT", "cost": 12, "cooldown": 12, "level": 15},
-        "Hidden Explosive Tag Technique": {"base": 28, "scaling": "INT", "cost": 14, "cooldown": 14, "level": 20},
-        "Shadow Shuriken Technique": {"base": 32, "scaling": "INT", "cost": 16, "cooldown": 16, "level": 25},
-        "Exploding Spiked Ball Technique": {"base": 36, "scaling": "INT", "cost": 18, "cooldown": 18, "level": 30},
-        "Bear Trap Technique": {"base": 40, "scaling": "INT", "cost": 20, "cooldown": 20, "level": 35},
-
-        # STR
-        "Shockwave Slash Technique": {"base": 25, "scaling": "STR", "cost": 11, "cooldown": 11, "level": 10},
-        "Risky Blade Dance Technique": {"base": 29, "scaling": "STR", "cost": 13, "cooldown": 13, "level": 15},
-        "Blade Piercing Technique": {"base": 33, "scaling": "STR", "cost": 15, "cooldown": 15, "level": 20},
-        "Wild Slashes Technique": {"base": 37, "scaling": "STR", "cost": 17, "cooldown": 17, "level": 25},
-        "Crescent Moon Beheading Technique": {"base": 41, "scaling": "STR", "cost": 19, "cooldown": 19, "level": 30},
-        "Dance of the Crescent Moon Technique": {"base": 45, "scaling": "STR", "cost": 22, "cooldown": 22, "level": 35}
-    },
-    "Taijutsu": {
-        # AGI
-        "Seismic Dash Technique": {"base": 26, "scaling": "AGI", "cost": 11, "cooldown": 10, "level": 10},
-        "Breaking Kick Technique": {"base": 30, "scaling": "AGI", "cost": 13, "cooldown": 12, "level": 15},
-        "Speed Mirage Technique": {"base": 34, "scaling": "AGI", "cost": 15, "cooldown": 14, "level": 20},
-        "Youthful Spring Technique": {"base": 38, "scaling": "AGI", "cost": 18, "cooldown": 16, "level": 25},
-        "Morning Peacock Technique": {"base": 42, "scaling": "AGI", "cost": 21, "cooldown": 18, "level": 30},
-        "Whirlwind Kick Technique": {"base": 46, "scaling": "AGI", "cost": 24, "cooldown": 20, "level": 35},
-
-        # STR
-        "Pressure Point Needle Technique": {"base": 28, "scaling": "STR", "cost": 12, "cooldown": 10, "level": 10},
-        "Water Needle Training": {"base": 32, "scaling": "STR", "cost": 14, "cooldown": 12, "level": 15},
-        "Palm Bottom Technique": {"base": 36, "scaling": "STR", "cost": 16, "cooldown": 14, "level": 20},
-        "Vacuum Palm Technique": {"base": 40, "scaling": "STR", "cost": 19, "cooldown": 16, "level": 25},
-        "Mountain Crusher Technique": {"base": 44, "scaling": "STR", "cost": 22, "cooldown": 18, "level": 30},
-        "Revolving Heavens Technique": {"base": 48, "scaling": "STR", "cost": 25, "cooldown": 20, "level": 35},
-        "16 Palms Technique": {"base": 52, "scaling": "STR", "cost": 28, "cooldown": 22, "level": 35}
-    },
-    "Common": {
-        "Body Flicker Technique": {"base": 0, "scaling": "N/A", "cost": 5, "cooldown": 10, "level": 1},
-        "Charging Chakra": {"base": 0, "scaling": "N/A", "cost": 0, "cooldown": 5, "level": 1},
-        "Cloak of Invisibility Technique": {"base": 0, "scaling": "N/A", "cost": 10, "cooldown": 15, "level": 1},
-        "Clone Technique": {"base": 0, "scaling": "N/A", "cost": 8, "cooldown": 10, "level": 1},
-        "Fuuma Wind Shuriken Technique": {"base": 20, "scaling": "STR", "cost": 10, "cooldown": 10, "level": 1},
-        "Kunai Shadow Clone Technique": {"base": 20, "scaling": "INT", "cost": 10, "cooldown": 10, "level": 1},
-        "Substitution Technique": {"base": 0, "scaling": "N/A", "cost": 10, "cooldown": 20, "level": 1},
-        "Sensory Technique": {"base": 0, "scaling": "N/A", "cost": 10, "cooldown": 10, "level": 1},
-        "Summoning Technique": {"base": 0, "scaling": "N/A", "cost": 25, "cooldown": 30, "level": 1},
-        "Transformation Technique": {"base": 0, "scaling": "N/A", "cost": 8, "cooldown": 10, "level": 1},
-        "Chakra Seal Technique": {"base": 0, "scaling": "N/A", "cost": 12, "cooldown": 20, "level": 1}
-    }
-}
+        st.number_input("AGI", min_value=5, value=5, step=1, key="agi_base", on_change=rerun_build_sections, args=("AGI",))
+        st.number_input("CHK", min_value=5, value=5, step=1, key="chk_base", on_change=rerun_build_sections, args=("CHK",))
+
+
+    @st.fragment(key="atributos")
+    def final_attributes_section(selection):
+        with metrics.span("fragmento.atributos"):
+            build_config, build = current_build(selection)
+            attributes = build["attributes"]
+
+            # Subheader para Atributos Finais (mais compacto)
+            st.subheader("Atributos Finais")
+            final_cols = st.columns(2)
+            with final_cols[0]:
+                st.metric("STR", attributes["STR"])
+                st.metric("FRT", attributes["FRT"])
+                st.metric("INT", attributes["INT"])
+            with final_cols[1]:
+                st.metric("AGI", attributes["AGI"])
+                st.metric("CHK", attributes["CHK"])
+
+            # Verifica requisitos da arma
+            if selection["weapon"]:
+                weapon_data = selection["data"].weapons_db[selection["weapon"]]
+
+                if build["weapon"]["meets_requirements"]:
+                    st.success("✅ Requisitos atendidos")
+                else:
+                    st.error("❌ Requisitos não atendidos")
+                    # Solver inverso: menor aumento nos atributos base que libera a arma
+                    upgrade = solve_requirements(
+                        selection["weapon"], selection["charm"], selection["guild_level"], selection["faction"],
+                        base=build_config, data=selection["data"])
+                    if upgrade["feasible"]:
+                        raises = ", ".join(f"{attr} {build_config[attr]} → {value}"
+                                           for attr, value in upgrade["base"].items() if value > build_config[attr])
+                        st.caption(f"Faltam {upgrade['extra_points']} pontos ({raises}); nível {upgrade['level']}")
+                    else:
+                        st.caption(f"Inalcançável com {MAX_POINTS} pontos")
+
+                equipable = requirement_index(selection["data"]).count(attributes)
+                st.caption(f"Armas liberadas: {equipable}/{len(selection['data'].weapons_db)}")
+
+                st.write(f"**Dano Base:** {weapon_data['base_damage']}")
+                st.write(f"**Escalonamento:** {weapon_data['scaling']}")
+                st.write(f"**Descrição:** {weapon_data['description']}")
+
+                # ===== CÁLCULO DE DANO DE ARMA =====
+                st.metric("Dano da Arma", f"{build['weapon']['damage']:.1f}")
+
+
+    final_attributes_section(selection)
+
+rerun.mark("atributos")
+
+
+# ===== STATUS =====
+@st.fragment(key="status")
+def status_section(selection):
+    with metrics.span("fragmento.status"):
+        _, build = current_build(selection)
+        total_spent = build["points_spent"]
+        st.header("📊 Status", divider="gray")
+        st.metric("Pontos Gastos", f"{total_spent}/{MAX_POINTS}")
+        st.metric("Pontos Disponíveis", build["remaining_points"])
+        st.metric("Nível", build["level"])
+
+        if total_spent > MAX_POINTS:
+            st.error(f"Limite de {MAX_POINTS} pontos excedido!")
+        elif total_spent > build["available_points"]:
+            st.warning("Pontos gastos excedem os disponíveis para este nível")
+
+
+with status_container:
+    status_section(selection)
+
+rerun.mark("status")
 
-# ===== CÁLCULO DE DANO DE ARMA =====
-if selected_weapon:
-    weapon_data = weapons_db[selected_weapon]
-    scaling_value = attributes[weapon_data["scaling"]]
-    weapon_damage = weapon_data["base_damage"] + (scaling_value * 0.6)
-    right_sidebar.metric("Dano da Arma", f"{weapon_damage:.1f}")
 
 # ===== EXIBIÇÃO DE TÉCNICAS =====
-def create_tech_df(element):
-    tech_data = techniques_db.get(element, {})
-    scaling_map = {"STR": attributes["STR"], "INT": attributes["INT"], "CHK": attributes["CHK"], "AGI": attributes["AGI"]}
-
-    tech_list = []
-    for name, data in tech_data.items():
-        scaling_value = scaling_map.get(data["scaling"], 0)
-        damage = data["base"] + (scaling_value * 0.6)
-        dps = damage / data["cooldown"] if data["cooldown"] > 0 else 0
-
-        tech_list.append({
-            "Técnica": name,
-            "Elemento": f"{EMOJI_MAP.get(element, '')} {element}",
-            "Dano Base": data["base"],
-            "Scaling": data["scaling"],
-            "Dano Total": damage,
-            "DPS": dps,
-            "Chakra": data["cost"],
-            "Cooldown": data["cooldown"],
-            "Nível": data["level"]
-        })
-
-    return pd.DataFrame(tech_list)
-
-# Técnicas dos elementos principais
-try:
-    df_primary = create_tech_df(primary)
-    df_secondary = create_tech_df(secondary)
-    df_combined = pd.concat([df_primary, df_secondary]).reset_index(drop=True)
-
-    st.header(f"📜 Técnicas de {label_with_emoji(primary)} + {label_with_emoji(secondary)}")
-    if not df_combined.empty:
-        styled_df = df_combined.style.apply(style_element, axis=1).format({
-            "Dano Total": "{:.1f}",
-            "DPS": "{:.1f}"
-        })
-        st.dataframe(
-            styled_df,
-            column_config={
-                "Dano Total": st.column_config.NumberColumn(format="%.1f"),
-                "DPS": st.column_config.NumberColumn(format="%.1f")
-            },
-            hide_index=True,
-            use_container_width=True,
-            height=min(600, 45 * len(df_combined) + 45))
-    else:
-        st.warning("Nenhuma técnica disponível para estes elementos")
-except Exception as e:
-    st.error(f"Erro ao gerar tabela: {str(e)}")
+@st.fragment(key="tecnicas")
+def techniques_section(selection):
+    with metrics.span("fragmento.tecnicas"):
+        data, primary, secondary = selection["data"], selection["primary"], selection["secondary"]
+        _, build = current_build(selection)
+        attribute_key, level, max_tech_level = build_view(selection, build)
+        st.session_state["shown_level"] = level
+
+        # Técnicas dos elementos principais
+        try:
+            tech_data, tech_columns, tech_rows = technique_table(
+                (primary, secondary), attribute_key, selection["render_mode"], max_tech_level, data,
+                partial=st.session_state.get("partial_rerun", False))
+
+            st.header(f"📜 Técnicas de {label_with_emoji(primary)} + {label_with_emoji(secondary)}")
+            if tech_rows:
+                with metrics.span("tecnicas.dataframe"):
+                    st.dataframe(
+                        tech_data,
+                        column_config=tech_columns,
+                        hide_index=True,
+                        width="stretch",
+                        height=min(600, 45 * tech_rows + 45))
+            else:
+                st.warning("Nenhuma técnica disponível para estes elementos")
+
+            next_unlocks = data.techniques.unlocking_at(level + 1, primary, secondary)
+            if level < MAX_LEVEL and len(next_unlocks):
+                st.info(f"🔓 Desbloqueia no nível {level + 1}: {', '.join(data.techniques.names[next_unlocks])}")
+        except Exception as e:
+            st.error(f"Erro ao gerar tabela: {str(e)}")
+
+
+techniques_section(selection)
+
+rerun.mark("tecnicas")
+
+
+# Curva de DPS por nível (mesmos atributos, técnicas liberadas em cada nível)
+@st.fragment(key="curva_dps")
+def dps_curve_section(selection):
+    with metrics.span("fragmento.curva_dps"):
+        # O gráfico é a parte mais cara da página: só é montado quando pedido
+        if not st.toggle("Mostrar curva", value=False, key="show_dps_curve"):
+            return
+        _, build = current_build(selection)
+        attribute_key, _, _ = build_view(selection, build)
+        levels = list(range(1, MAX_LEVEL + 1))
+        dps_curve = selection["data"].techniques.dps_curve(
+            attribute_key, selection["primary"], selection["secondary"], levels=levels)
+        st.line_chart(pd.DataFrame({"DPS": dps_curve}, index=pd.Index(levels, name="Nível")))
+
+
+with st.expander("📈 Curva de DPS por nível"):
+    dps_curve_section(selection)
+
+rerun.mark("curva_dps")
+
 
 # Técnicas comuns (se ativado)
-if show_common:
-    try:
-        df_common = create_tech_df("Common")
-        if not df_common.empty:
-            st.header(f"📜 Técnicas Comuns")
-            styled_common = df_common.style.apply(style_element, axis=1).format({
-                "Dano Total": "{:.1f}",
-                "DPS": "{:.1f}"
-            })
+@st.fragment(key="comuns")
+def common_techniques_section(selection):
+    with metrics.span("fragmento.comuns"):
+        if not st.session_state.get("show_common"):
+            return
+        _, build = current_build(selection)
+        attribute_key, _, max_tech_level = build_view(selection, build)
+        try:
+            common_data, common_columns, common_rows = technique_table(
+                ("Common",), attribute_key, selection["render_mode"], max_tech_level, selection["data"],
+                partial=st.session_state.get("partial_rerun", False))
+            if common_rows:
+                st.header(f"📜 Técnicas Comuns")
+                with metrics.span("tecnicas_comuns.dataframe"):
+                    st.dataframe(
+                        common_data,
+                        column_config=common_columns,
+                        hide_index=True,
+                        width="stretch"
+                    )
+        except Exception as e:
+            st.error(f"Erro ao gerar tabela de técnicas comuns: {str(e)}")
+
+
+common_techniques_section(selection)
+
+rerun.mark("tecnicas_comuns")
+
+
+# ===== SIMULADOR DE ROTAÇÃO =====
+@st.fragment(key="rotacao")
+def rotation_section(selection):
+    with metrics.span("fragmento.rotacao"):
+        data = selection["data"]
+        st.caption("Uma ação por GCD, respeitando cooldowns e chakra; Charging Chakra recupera parte do pool")
+        # A simulação roda a cada mudança de atributo enquanto estiver ligada
+        if not st.toggle("Simular", value=False, key="simulate_rotation"):
+            return
+        sim_cols = st.columns(2)
+        with sim_cols[0]:
+            fight_duration = st.slider("Duração da luta (s)", 30, 600, 600, step=30)
+        with sim_cols[1]:
+            sim_common = st.checkbox("Usar técnicas comuns", value=True)
+
+        _, build = current_build(selection)
+        attributes = build["attributes"]
+        attribute_key, _, max_tech_level = build_view(selection, build)
+        loadout = loadout_indices(selection["primary"], selection["secondary"], include_common=sim_common,
+                                  level=max_tech_level, data=data)
+        simulation = simulate_rotation(attributes, loadout, weapon=selection["weapon"], duration=fight_duration, data=data)
+        naive_dps = data.techniques.dps(data.techniques.damage(attribute_key, loadout), loadout).sum()
+
+        metric_cols = st.columns(3)
+        metric_cols[0].metric("DPS Sustentado", f"{simulation['sustained_dps']:.1f}")
+        metric_cols[1].metric("DPS Isolado (soma)", f"{naive_dps:.1f}")
+        metric_cols[2].metric("Pool de Chakra", chakra_pool(attributes))
+        st.dataframe(
+            pd.DataFrame({"Técnica": list(simulation["casts"].keys()), "Usos": list(simulation["casts"].values())}),
+            hide_index=True,
+            width="stretch"
+        )
+        st.caption(f"Charging Chakra: {simulation['charges']}x | Ataques da arma: {simulation['weapon_hits']}")
+
+
+with st.expander("⚔️ Simulador de Rotação"):
+    rotation_section(selection)
+
+rerun.mark("rotacao")
+
+
+# ===== OTIMIZADOR DE BUILD =====
+# Não depende dos atributos base: seus widgets reexecutam só este fragmento
+@st.fragment(key="otimizador")
+def optimizer_section(selection):
+    st.caption(f"Busca todas as distribuições de até {MAX_POINTS} pontos para os elementos, charm, facção e guild selecionados")
+    opt_cols = st.columns(4)
+    with opt_cols[0]:
+        objective = st.selectbox("Objetivo", list(OBJECTIVES.keys()), format_func=OBJECTIVES.get)
+    with opt_cols[1]:
+        top_n = st.number_input("Top N", min_value=1, max_value=100, value=10, step=1)
+    with opt_cols[2]:
+        require_weapon = st.checkbox("Exigir requisitos da arma", value=True)
+    with opt_cols[3]:
+        include_common = st.checkbox("Incluir técnicas comuns", value=False)
+
+    if st.button("Otimizar"):
+        data = selection["data"]
+        results = optimize_builds(
+            selection["primary"], selection["secondary"], selection["charm"], selection["guild_level"],
+            data.faction_bonuses[selection["faction"]],
+            objective=objective, weapon=selection["weapon"], require_weapon=require_weapon,
+            include_common=include_common, top_n=int(top_n), data=data
+        )
+        if results:
+            st.dataframe(
+                pd.DataFrame(results),
+                column_config={OBJECTIVES[objective]: st.column_config.NumberColumn(format="%.1f")},
+                hide_index=True,
+                width="stretch"
+            )
+        else:
+            st.warning("Nenhuma build atende aos requisitos da arma")
+
+
+with st.expander("🧠 Otimizador de Build"):
+    optimizer_section(selection)
+
+rerun.mark("otimizador")
+
+
+# ===== FRONTEIRA DE PARETO =====
+@st.fragment(key="pareto")
+def pareto_section(selection):
+    data = selection["data"]
+    st.caption("Builds não dominadas em burst, DPS, dano por chakra e armas liberadas")
+    pareto_cols = st.columns(4)
+    with pareto_cols[0]:
+        pareto_charms = st.multiselect("Charms", data.charms, default=data.charms, format_func=label_charm)
+    with pareto_cols[1]:
+        pareto_factions = st.multiselect("Facções", list(data.faction_bonuses.keys()), default=[selection["faction"]],
+                                         format_func=label_faction)
+    with pareto_cols[2]:
+        pareto_guild = st.slider("Guild Level", 0, 10, (selection["guild_level"], selection["guild_level"]))
+    with pareto_cols[3]:
+        pareto_step = st.selectbox("Passo (pontos)", [15, 5, 3, 1], index=1)
+
+    if st.toggle("Calcular fronteira", value=False):
+        frontier = explorer.frontier(
+            selection["primary"], selection["secondary"], charms=pareto_charms, factions=pareto_factions,
+            guild_levels=range(pareto_guild[0], pareto_guild[1] + 1), step=pareto_step, data=data
+        )
+        if frontier:
+            df_frontier = pd.DataFrame(frontier)
+            st.scatter_chart(df_frontier, x=PARETO_OBJECTIVES["burst"], y=PARETO_OBJECTIVES["dps"], color="Charm")
             st.dataframe(
-                styled_common,
+                df_frontier,
+                column_config={label: st.column_config.NumberColumn(format="%.2f") for label in PARETO_OBJECTIVES.values()},
+                hide_index=True,
+                width="stretch"
+            )
+        else:
+            st.warning("Selecione ao menos um charm e uma facção")
+
+
+with st.expander("🧭 Explorador de Fronteira de Pareto"):
+    pareto_section(selection)
+
+rerun.mark("pareto")
+
+
+# ===== BIBLIOTECA DE BUILDS =====
+@st.fragment(key="biblioteca")
+def library_section(selection):
+    data, data_version = selection["data"], selection["data_version"]
+    primary, secondary, weapon = selection["primary"], selection["secondary"], selection["weapon"]
+    save_cols = st.columns([3, 1])
+    with save_cols[0]:
+        build_name = st.text_input("Nome da build", placeholder="Ex.: Fire/Wind INT full")
+    with save_cols[1]:
+        st.write("")
+        if st.button("Salvar build atual", disabled=not build_name.strip()):
+            build_config, _ = current_build(selection)
+            build_library.save(build_name.strip(), build_config, data_version=data_version)
+            st.success(f"Build '{build_name.strip()}' salva")
+
+    filter_cols = st.columns([2, 2, 3])
+    with filter_cols[0]:
+        same_elements = st.checkbox(f"Somente {primary} + {secondary}", value=True)
+    with filter_cols[1]:
+        same_weapon = st.checkbox(f"Somente {weapon}", value=False)
+    with filter_cols[2]:
+        name_filter = st.text_input("Buscar por nome", placeholder="Trecho do nome", label_visibility="collapsed")
+    filters = {
+        "primary": primary if same_elements else None,
+        "secondary": secondary if same_elements else None,
+        "weapon": weapon if same_weapon else None,
+        "name": name_filter.strip() or None,
+    }
+    total_saved = build_library.count(**filters)
+    pages = max(1, -(-total_saved // LIST_LIMIT))
+    page = 1
+    if pages > 1:
+        page = st.number_input(f"Página (de {pages}, {total_saved} builds)", min_value=1, max_value=pages, value=1)
+    saved_builds = build_library.list_builds(**filters, offset=(page - 1) * LIST_LIMIT)
+
+    # As já selecionadas continuam nas opções ao trocar de página ou de busca
+    kept_ids = st.session_state.get("library_selected", [])
+    kept = build_library.get_many(kept_ids) if kept_ids else []
+    if len(kept) != len(kept_ids):  # excluídas em outra sessão
+        st.session_state["library_selected"] = [b["id"] for b in kept]
+    saved_labels = {b["id"]: f"{b['name']} (#{b['id']})" for b in kept + saved_builds}
+    selected_ids = st.multiselect("Builds para comparar", list(saved_labels), format_func=saved_labels.get,
+                                  key="library_selected")
+
+    if selected_ids:
+        try:
+            # Uma avaliação em lote para todas as selecionadas; resultados em cache pelo hash da build
+            df_saved = pd.DataFrame(build_library.compare(selected_ids, data=data))
+            st.dataframe(
+                df_saved,
                 column_config={
-                    "Dano Total": st.column_config.NumberColumn(format="%.1f"),
-                    "DPS": st.column_config.NumberColumn(format="%.1f")
+                    "Dano da Arma": st.column_config.NumberColumn(format="%.1f"),
+                    "Melhor Técnica": st.column_config.NumberColumn(format="%.1f"),
+                    "DPS Total": st.column_config.NumberColumn(format="%.1f"),
                 },
                 hide_index=True,
-                use_container_width=True
+                width="stretch"
             )
-    except Exception as e:
-        st.error(f"Erro ao gerar tabela de técnicas comuns: {str(e)}")
+        except ValueError as e:
+            st.warning(f"Alguma build não existe na versão {data_version}: {str(e)}")
+        if st.button("Excluir selecionadas"):
+            build_library.delete(selected_ids)
+            del st.session_state["library_selected"]
+            st.rerun(scope="fragment")
+    elif not saved_builds:
+        st.caption("Nenhuma build salva com estes filtros")
+
+
+with st.expander("💾 Biblioteca de Builds"):
+    library_section(selection)
+
+rerun.mark("biblioteca")
+
+
+# ===== COMPARAÇÃO ENTRE VERSÕES =====
+@st.fragment(key="versoes")
+def versions_section(selection):
+    with metrics.span("fragmento.versoes"):
+        data_version = selection["data_version"]
+        other_versions = [v for v in available_versions() if v != data_version]
+        if not other_versions:
+            st.caption("Só há uma versão de dados disponível")
+            return
+        other_version = st.selectbox("Comparar com", other_versions, index=len(other_versions) - 1)
+        build_config, build = current_build(selection)
+        try:
+            other_build = cached_evaluate_build(build_config, data=load_game_data(other_version))
+        except ValueError as e:
+            st.warning(f"Build não existe na versão {other_version}: {str(e)}")
+        else:
+            comparison = {}
+            for version, result in ((data_version, build), (other_version, other_build)):
+                column = dict(result["attributes"])
+                column["Dano da Arma"] = result["weapon"]["damage"] if result["weapon"] else 0.0
+                column["DPS Total"] = sum(t["dps"] for t in result["techniques"])
+                column["Técnicas"] = len(result["techniques"])
+                comparison[version] = column
+            df_comparison = pd.DataFrame(comparison)
+            df_comparison["Diferença"] = df_comparison[other_version] - df_comparison[data_version]
+            st.dataframe(df_comparison.style.format("{:.1f}"), width="stretch")
+
+
+with st.expander("🔁 Comparar versões dos dados"):
+    versions_section(selection)
+
+rerun.mark("versoes")
 
 # ===== CRÉDITOS E IMAGEM =====
 
-img_url = "https://media.discordapp.net/attachments/225436696831983616/1393220653553025064/eIOxkDA.png?ex=68726158&is=68710fd8&hm=2f8b9ff16895844008dfb2a6ea94457fcefc228f482a81cebf617ee7f4c7bf72&="
+img_url = os.environ.get("NINOFF_CREDITS_URL") or "https://media.discordapp.net/attachments/225436696831983616/1393220653553025064/eIOxkDA.png?ex=68726158&is=68710fd8&hm=2f8b9ff16895844008dfb2a6ea94457fcefc228f482a81cebf617ee7f4c7bf72&="
 
 try:
-    response = requests.get(img_url)
-    img = Image.open(BytesIO(response.content))
+    with metrics.span("creditos.imagem"):
+        img = asset_cache.get_image(img_url)
     
     # Restante do seu código...
     col1, col2 = st.columns([1, 3])
@@ -440,3 +606,42 @@ except Exception as e:
 # ===== RODAPÉ =====
 st.divider()
 st.caption("🎮 Dica: Clique nos cabeçalhos para ordenar | Atualize a página para resetar")
+rerun.mark("creditos")
+rerun.finish()
+
+if capture is not None:
+    st.session_state.pop("capture_active", None)
+    st.session_state["capture_report"] = (capture_kind, capture.stop())
+
+# ===== PAINEL DE DEPURAÇÃO (?debug=1 ou NINOFF_DEBUG=1) =====
+if debug_enabled(st.query_params):
+    with st.expander("🛠️ Depuração: tempos por seção", expanded=True):
+        snapshot = metrics.snapshot()
+        df_metrics = pd.DataFrame.from_dict(snapshot, orient="index")
+        for column in ("p50", "p95", "p99", "last"):
+            df_metrics[column] *= 1000
+        st.dataframe(
+            df_metrics[["p50", "p95", "p99", "last", "count"]].rename(columns={"last": "último"}),
+            column_config={c: st.column_config.NumberColumn(f"{c} (ms)", format="%.2f") for c in ("p50", "p95", "p99", "último")},
+            width="stretch"
+        )
+        st.caption(f"Janela de {metrics.window} amostras por seção, somando todas as sessões deste processo")
+
+        export_cols = st.columns(3)
+        export_cols[0].download_button("⬇️ JSON", metrics.to_json(), file_name="ninoff-metrics.json", mime="application/json")
+        export_cols[1].download_button("⬇️ Prometheus", metrics.to_prometheus(), file_name="ninoff-metrics.prom", mime="text/plain")
+        if export_cols[2].button("💾 Exportar para arquivo"):
+            st.success(f"Métricas gravadas em {metrics.export()}")
+
+        capture_cols = st.columns([2, 1])
+        with capture_cols[0]:
+            next_capture = st.radio("Captura de perfil", list(CAPTURE_KINDS), format_func=CAPTURE_KINDS.get, horizontal=True)
+        with capture_cols[1]:
+            if st.button("Perfilar próximo rerun"):
+                st.session_state["capture_kind"] = next_capture
+                st.rerun()
+
+        if "capture_report" in st.session_state:
+            report_kind, report = st.session_state["capture_report"]
+            st.caption(f"Último perfil: {CAPTURE_KINDS[report_kind]}")
+            st.code(report, language="text")
@@ -0,0 +1,355 @@
+import argparse
+import asyncio
+import json
+import os
+import threading
+from collections import OrderedDict
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+from build_store import validate_config
+from engine import ATTRIBUTES, evaluate_builds, resolve
+from game_data import available_versions
+from instrumentation import metrics
+
+# ===== CONFIGURAÇÃO =====
+HOST = os.environ.get("NINOFF_API_HOST", "127.0.0.1")
+PORT = int(os.environ.get("NINOFF_API_PORT", "8765"))
+CACHE_SIZE = int(os.environ.get("NINOFF_API_CACHE", "65536"))
+BATCH_WINDOW = 0.002  # segundos que um pedido espera por outros para avaliarem juntos
+BATCH_MAX = 512
+MAX_BODY = 1 << 20
+MAX_BATCH_BUILDS = 10_000
+TECHNIQUE_COLUMNS = ["name", "damage", "dps"]
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+               413: "Payload Too Large", 500: "Internal Server Error"}
+JSON_ENCODER = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"), check_circular=False)
+
+
+# ===== CACHE DE RESULTADOS =====
+def cache_key(config, include_common, data):
+    # Configuração já normalizada (validate_config): builds equivalentes caem na mesma chave
+    return (data.hash, include_common) + tuple(config[attr] for attr in ATTRIBUTES) + (
+        config["primary"], config["secondary"], config["charm"], config["faction"],
+        config["guild_level"], config["weapon"])
+
+
+class ResultCache:
+    # LRU de respostas já serializadas (bytes): um acerto não toca no engine nem no encoder
+    def __init__(self, size=CACHE_SIZE):
+        self.size = size
+        self._results = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            value = self._results.get(key)
+            if value is None:
+                self.misses += 1
+            else:
+                self._results.move_to_end(key)
+                self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._results[key] = value
+            self._results.move_to_end(key)
+            while len(self._results) > self.size:
+                self._results.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            return {"size": len(self._results), "capacity": self.size, "hits": self.hits, "misses": self.misses}
+
+    def clear(self):
+        with self._lock:
+            self._results.clear()
+            self.hits = self.misses = 0
+
+
+# ===== AVALIAÇÃO =====
+def encode_results(configs, include_common, data):
+    # Uma chamada de evaluate_builds para o lote; cada resultado vira bytes compactos: técnicas como
+    # linhas [nome, dano, dps] (ver TECHNIQUE_COLUMNS) e floats com 2 casas
+    batch = evaluate_builds(configs, include_common=include_common, data=data)
+    names = list(data.techniques.names)
+    weapon_names = list(data.weapon_names)
+    columns = zip(
+        batch.attributes.tolist(), batch.level.tolist(), batch.points_spent.tolist(),
+        batch.remaining_points.tolist(), batch.weapon.tolist(), np.round(batch.weapon_damage, 2).tolist(),
+        batch.meets_requirements.tolist(), batch.tech_index.tolist(), np.round(batch.tech_damage, 2).tolist(),
+        np.round(batch.tech_dps, 2).tolist(),
+    )
+    encoded = []
+    for attrs, level, spent, remaining, weapon, weapon_damage, meets, t_index, t_damage, t_dps in columns:
+        result = {
+            "attributes": dict(zip(ATTRIBUTES, attrs)),
+            "level": level,
+            "points_spent": spent,
+            "remaining_points": remaining,
+            "weapon": None if weapon < 0 else {
+                "name": weapon_names[weapon], "damage": weapon_damage, "meets_requirements": meets,
+            },
+            "techniques": [[names[t], d, p] for t, d, p in zip(t_index, t_damage, t_dps) if t >= 0],
+        }
+        encoded.append(JSON_ENCODER.encode(result).encode("utf-8"))
+    return encoded
+
+
+class Batcher:
+    # Junta pedidos simultâneos (até BATCH_MAX ou BATCH_WINDOW) numa única avaliação em lote.
+    # Chaves repetidas em voo compartilham o mesmo future
+    def __init__(self, cache, window=BATCH_WINDOW, max_size=BATCH_MAX):
+        self.cache = cache
+        self.window = window
+        self.max_size = max_size
+        self._pending = {}  # (data.hash, include_common) -> {chave: (config, future)}
+        self._data = {}
+        self._timers = {}
+
+    def submit(self, key, config, include_common, data):
+        group = (data.hash, include_common)
+        pending = self._pending.setdefault(group, {})
+        if key in pending:
+            return pending[key][1]
+        future = asyncio.get_running_loop().create_future()
+        pending[key] = (config, future)
+        self._data[group] = data
+        if len(pending) >= self.max_size:
+            self._flush(group)
+        elif group not in self._timers:
+            self._timers[group] = asyncio.get_running_loop().call_later(self.window, self._flush, group)
+        return future
+
+    def _flush(self, group):
+        timer = self._timers.pop(group, None)
+        if timer is not None:
+            timer.cancel()
+        pending = self._pending.pop(group, None)
+        if not pending:
+            return
+        include_common, data = group[1], self._data.pop(group)
+        try:
+            with metrics.span("api.batch"):
+                encoded = encode_results([config for config, _ in pending.values()], include_common, data)
+        except Exception:  # noqa: BLE001 (o lote falhou: cada build é avaliada sozinha abaixo)
+            encoded = None
+        for i, (key, (config, future)) in enumerate(pending.items()):
+            if encoded is not None:
+                value = encoded[i]
+            else:
+                # Uma entrada ruim não pode derrubar os pedidos dos outros usuários do mesmo lote
+                try:
+                    value = encode_results([config], include_common, data)[0]
+                except Exception as e:  # noqa: BLE001 (repassado só ao pedido desta build)
+                    if not future.done():
+                        future.set_exception(e)
+                    continue
+            self.cache.put(key, value)
+            if not future.done():
+                future.set_result(value)
+
+
+# ===== SERVIÇO =====
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class BuildService:
+    def __init__(self, cache_size=CACHE_SIZE, window=BATCH_WINDOW):
+        self.cache = ResultCache(cache_size)
+        self.batcher = Batcher(self.cache, window)
+
+    def _data(self, query):
+        version = query.get("version", [None])[0]
+        if version is not None and version not in available_versions():
+            raise ApiError(400, f"Versão de dados desconhecida: {version}")
+        try:
+            return resolve(version)
+        except ValueError as e:
+            raise ApiError(400, str(e))
+
+    def _prepare(self, raw, data):
+        if not isinstance(raw, dict):
+            raise ApiError(400, "cada build deve ser um objeto JSON")
+        try:
+            return validate_config(raw, data)
+        except KeyError as e:
+            raise ApiError(400, f"campo obrigatório ausente: {e.args[0]}")
+        except (TypeError, ValueError) as e:
+            raise ApiError(400, str(e))
+
+    async def evaluate_one(self, raw, query):
+        # Um build por pedido: cache primeiro, senão entra no próximo lote do Batcher
+        data = self._data(query)
+        include_common = query.get("common", ["0"])[0] in ("1", "true")
+        config = self._prepare(raw, data)
+        key = cache_key(config, include_common, data)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached, data
+        return await self.batcher.submit(key, config, include_common, data), data
+
+    def evaluate_many(self, raws, query):
+        # Lote explícito: os que faltam no cache vão numa única chamada de evaluate_builds;
+        # builds inválidas viram {"error": ...} na sua posição
+        data = self._data(query)
+        include_common = query.get("common", ["0"])[0] in ("1", "true")
+        if not isinstance(raws, list):
+            raise ApiError(400, "'builds' deve ser uma lista")
+        if len(raws) > MAX_BATCH_BUILDS:
+            raise ApiError(413, f"no máximo {MAX_BATCH_BUILDS} builds por lote")
+        results, missing = [None] * len(raws), {}
+        for i, raw in enumerate(raws):
+            try:
+                config = self._prepare(raw, data)
+            except ApiError as e:
+                results[i] = JSON_ENCODER.encode({"error": str(e)}).encode("utf-8")
+                continue
+            key = cache_key(config, include_common, data)
+            results[i] = self.cache.get(key)
+            if results[i] is None:
+                missing.setdefault(key, (config, []))[1].append(i)
+        if missing:
+            with metrics.span("api.batch"):
+                encoded = encode_results([config for config, _ in missing.values()], include_common, data)
+            for (key, (_, positions)), value in zip(missing.items(), encoded):
+                self.cache.put(key, value)
+                for i in positions:
+                    results[i] = value
+        return results, data
+
+    async def handle(self, method, target, body):
+        # Retorna (status, bytes do corpo, cabeçalhos extras)
+        url = urlsplit(target)
+        query = parse_qs(url.query)
+        if url.path == "/health":
+            return 200, b'{"status":"ok"}', {}
+        if url.path == "/versions":
+            return 200, JSON_ENCODER.encode({"versions": available_versions()}).encode("utf-8"), {}
+        if url.path == "/stats":
+            return 200, JSON_ENCODER.encode({"cache": self.cache.stats()}).encode("utf-8"), {}
+        if url.path == "/metrics":
+            return 200, metrics.to_prometheus().encode("utf-8"), {"Content-Type": "text/plain; version=0.0.4"}
+        if url.path not in ("/evaluate", "/batch"):
+            raise ApiError(404, f"rota desconhecida: {url.path}")
+        if method != "POST":
+            raise ApiError(405, "use POST")
+        try:
+            payload = json.loads(body or b"null")
+        except ValueError as e:
+            raise ApiError(400, f"JSON inválido: {e}")
+
+        with metrics.span(f"api{url.path}"):
+            if url.path == "/evaluate":
+                result, data = await self.evaluate_one(payload, query)
+                return 200, result, {"X-Data-Version": data.version}
+            if not isinstance(payload, dict):
+                raise ApiError(400, "esperado {\"builds\": [...]}")
+            results, data = self.evaluate_many(payload.get("builds"), query)
+            head = JSON_ENCODER.encode({"data_version": data.version, "technique_columns": TECHNIQUE_COLUMNS})
+            return 200, head[:-1].encode("utf-8") + b',"results":[' + b",".join(results) + b"]}", {
+                "X-Data-Version": data.version}
+
+
+# ===== HTTP (asyncio puro, HTTP/1.1 com keep-alive) =====
+def _response(status, body, headers, keep_alive):
+    lines = [f"HTTP/1.1 {status} {STATUS_TEXT.get(status, 'OK')}",
+             f"Content-Type: {headers.pop('Content-Type', 'application/json')}",
+             f"Content-Length: {len(body)}",
+             f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+    lines += [f"{name}: {value}" for name, value in headers.items()]
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body
+
+
+def _content_length(headers):
+    value = headers.get("content-length", "")
+    if not value:
+        return 0
+    if not (value.isascii() and value.isdigit()):
+        raise ApiError(400, f"Content-Length inválido: {value[:32]!r}")
+    if len(value.lstrip("0")) > len(str(MAX_BODY)) or int(value) > MAX_BODY:
+        raise ApiError(400, f"corpo grande demais (máximo {MAX_BODY} bytes)")
+    return int(value)
+
+
+async def _serve_connection(service, reader, writer):
+    try:
+        while True:
+            request_line = await reader.readline()
+            if not request_line.strip():
+                break
+            try:
+                method, target, version = request_line.decode("latin-1").split()
+            except ValueError:
+                break
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+            keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+
+            try:
+                length = _content_length(headers)
+            except ApiError as e:
+                # Sem um tamanho confiável não dá para achar o fim do corpo: responde e fecha a conexão
+                writer.write(_response(e.status, JSON_ENCODER.encode({"error": str(e)}).encode("utf-8"), {}, False))
+                await writer.drain()
+                break
+            body = await reader.readexactly(length) if length else b""
+
+            try:
+                status, payload, extra = await service.handle(method, target, body)
+            except ApiError as e:
+                status, payload, extra = e.status, JSON_ENCODER.encode({"error": str(e)}).encode("utf-8"), {}
+            except Exception as e:  # noqa: BLE001 (o servidor segue atendendo)
+                status, payload, extra = 500, JSON_ENCODER.encode({"error": str(e)}).encode("utf-8"), {}
+            writer.write(_response(status, payload, extra, keep_alive))
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(host=HOST, port=PORT, service=None, ready=None):
+    service = service or BuildService()
+    server = await asyncio.start_server(lambda r, w: _serve_connection(service, r, w), host, port)
+    if ready is not None:
+        ready(server)
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="API JSON do Nin0ff-Meta (avaliação de builds com cache)")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--cache-size", type=int, default=CACHE_SIZE)
+    parser.add_argument("--batch-window-ms", type=float, default=BATCH_WINDOW * 1000)
+    args = parser.parse_args(argv)
+
+    service = BuildService(args.cache_size, args.batch_window_ms / 1000)
+
+    def ready(server):
+        address = server.sockets[0].getsockname()
+        print(f"API em http://{address[0]}:{address[1]} (dados {resolve().version})", flush=True)
+
+    try:
+        asyncio.run(serve(args.host, args.port, service, ready))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
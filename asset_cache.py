@@ -0,0 +1,155 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from io import BytesIO
+
+import requests
+from PIL import Image
+
+# ===== CONFIGURAÇÃO =====
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.environ.get("NINOFF_ASSET_CACHE", os.path.join(BASE_DIR, ".cache", "assets"))
+FALLBACK_IMAGE = os.path.join(BASE_DIR, "assets", "creditos_fallback.png")
+DEFAULT_TTL = 24 * 60 * 60  # segundos
+DEFAULT_TIMEOUT = (2, 5)  # (conexão, leitura)
+RETRY_AFTER = 60  # segundos sem tentar a rede depois de uma falha
+
+
+class AssetEntry:
+    def __init__(self, content, etag=None, last_modified=None, fetched_at=0.0):
+        self.content = content
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fetched_at = fetched_at
+        self.image = None
+        self.invalid = False  # conteúdo que o PIL não abre; não é decodificado de novo
+
+    def is_fresh(self, ttl):
+        return time.time() - self.fetched_at < ttl
+
+
+class AssetCache:
+    def __init__(self, cache_dir=CACHE_DIR, ttl=DEFAULT_TTL, timeout=DEFAULT_TIMEOUT,
+                 retry_after=RETRY_AFTER, session=None):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self.session = session or requests.Session()
+        self._entries = {}
+        self._failures = {}
+        self._fetching = set()  # URLs com download em andamento (no máximo um por URL)
+        self._lock = threading.Lock()
+        self._fallback = None
+
+    # ===== DISCO =====
+    def _paths(self, url):
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.bin"), os.path.join(self.cache_dir, f"{key}.json")
+
+    def _load_disk(self, url):
+        data_path, meta_path = self._paths(url)
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(data_path, "rb") as f:
+                content = f.read()
+        except (OSError, ValueError):
+            return None
+        return AssetEntry(content, meta.get("etag"), meta.get("last_modified"), meta.get("fetched_at", 0.0))
+
+    def _save_disk(self, url, entry):
+        data_path, meta_path = self._paths(url)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(data_path, "wb") as f:
+                f.write(entry.content)
+            with open(meta_path, "w", encoding="utf-8") as f:
+                json.dump({"url": url, "etag": entry.etag, "last_modified": entry.last_modified,
+                           "fetched_at": entry.fetched_at}, f)
+        except OSError:
+            pass  # Cache em disco é opcional; o cache em memória continua valendo
+
+    # ===== REDE =====
+    def _refresh(self, url, entry):
+        headers = {}
+        if entry is not None:
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+
+        response = self.session.get(url, headers=headers, timeout=self.timeout)
+        if response.status_code == 304 and entry is not None:
+            entry.fetched_at = time.time()
+            return entry
+        response.raise_for_status()
+        return AssetEntry(response.content, response.headers.get("ETag"),
+                          response.headers.get("Last-Modified"), time.time())
+
+    # ===== API =====
+    def get_entry(self, url):
+        # O lock só protege o estado; a rede roda fora dele, para que um CDN lento não trave os
+        # reruns das outras sessões. Quem chega com um download em andamento recebe a cópia atual
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is None:
+                entry = self._load_disk(url)
+                if entry is not None:
+                    self._entries[url] = entry
+            if entry is not None and entry.is_fresh(self.ttl):
+                return entry
+            if url in self._fetching or time.time() - self._failures.get(url, 0.0) < self.retry_after:
+                return entry
+            self._fetching.add(url)
+
+        try:
+            refreshed = self._refresh(url, entry)
+        except requests.RequestException:
+            with self._lock:
+                self._fetching.discard(url)
+                self._failures[url] = time.time()
+            return entry  # Cópia vencida é melhor do que nada; None se nunca baixou
+
+        with self._lock:
+            self._fetching.discard(url)
+            self._failures.pop(url, None)
+            self._entries[url] = refreshed
+        self._save_disk(url, refreshed)
+        return refreshed
+
+    def get_bytes(self, url):
+        entry = self.get_entry(url)
+        return entry.content if entry is not None else None
+
+    def get_image(self, url, fallback=FALLBACK_IMAGE):
+        entry = self.get_entry(url)
+        if entry is not None and not entry.invalid:
+            if entry.image is None:
+                try:
+                    image = Image.open(BytesIO(entry.content))
+                    image.load()
+                    entry.image = image
+                except OSError:
+                    entry.invalid = True  # Fica marcada até o próximo download trazer outro conteúdo
+            if entry.image is not None:
+                return entry.image
+        return self.fallback_image(fallback)
+
+    def fallback_image(self, path=FALLBACK_IMAGE):
+        if self._fallback is None:
+            self._fallback = Image.open(path)
+            self._fallback.load()
+        return self._fallback
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._failures.clear()
+            self._fetching.clear()
+
+
+# Instância compartilhada pelo processo (sobrevive aos reruns do Streamlit)
+asset_cache = AssetCache()
@@ -0,0 +1,149 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, ROOT_DIR)
+
+from engine import ATTRIBUTES, load_game_data  # noqa: E402
+
+# ===== CONFIGURAÇÃO =====
+API_PATH = os.path.join(ROOT_DIR, "api.py")
+REQUESTS = 20_000
+CONCURRENCY = 64
+CONFIGS = 200  # builds distintas; depois do aquecimento todas vêm do cache
+STARTUP_TIMEOUT = 30
+
+
+# ===== CARGA =====
+def sample_configs(count, seed=0):
+    data = load_game_data()
+    rng = random.Random(seed)
+    configs = []
+    for _ in range(count):
+        primary, secondary = rng.sample(data.elements, 2)
+        config = {attr: rng.randint(5, 80) for attr in ATTRIBUTES}
+        config.update({
+            "primary": primary, "secondary": secondary, "charm": rng.choice(data.charms),
+            "faction": rng.choice(list(data.faction_bonuses)), "guild_level": rng.randint(0, 10),
+            "weapon": rng.choice(data.weapon_names),
+        })
+        configs.append(config)
+    return configs
+
+
+def _request(host, path, body):
+    return (f"POST {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n").encode("latin-1") + body
+
+
+async def _read_response(reader):
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    return status, await reader.readexactly(length)
+
+
+async def _worker(host, port, payloads, counter, total, latencies, errors):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while counter[0] < total:
+            payload = payloads[counter[0] % len(payloads)]
+            counter[0] += 1
+            start = time.perf_counter()
+            writer.write(payload)
+            status, _ = await _read_response(reader)
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors.append(status)
+    finally:
+        writer.close()
+
+
+async def run_load(host, port, payloads, total, concurrency):
+    latencies, errors, counter = [], [], [0]
+    start = time.perf_counter()
+    await asyncio.gather(*(_worker(host, port, payloads, counter, total, latencies, errors)
+                           for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "seconds": elapsed,
+        "rps": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+# ===== SERVIDOR =====
+def start_server():
+    # Sobe api.py num processo separado (porta livre escolhida pelo sistema) e lê o endereço
+    process = subprocess.Popen([sys.executable, API_PATH, "--port", "0"], stdout=subprocess.PIPE, text=True)
+    deadline = time.time() + STARTUP_TIMEOUT
+    while time.time() < deadline:
+        line = process.stdout.readline()
+        if line.startswith("API em http://"):
+            host, port = line.split()[2][len("http://"):].rsplit(":", 1)
+            return process, host, int(port)
+        if process.poll() is not None:
+            break
+    process.kill()
+    raise RuntimeError("api.py não subiu")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Teste de carga local da API JSON (api.py)")
+    parser.add_argument("--requests", type=int, default=REQUESTS)
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY)
+    parser.add_argument("--configs", type=int, default=CONFIGS, help="builds distintas no ciclo")
+    parser.add_argument("--batch", type=int, default=0, help="usa /batch com este número de builds por pedido")
+    parser.add_argument("--url", help="host:porta de uma API já rodando (padrão: sobe uma)")
+    args = parser.parse_args(argv)
+
+    configs = sample_configs(args.configs)
+    if args.batch:
+        chunks = [configs[i:i + args.batch] for i in range(0, len(configs), args.batch)]
+        bodies = [("/batch", json.dumps({"builds": chunk}).encode("utf-8")) for chunk in chunks]
+    else:
+        bodies = [("/evaluate", json.dumps(config).encode("utf-8")) for config in configs]
+
+    process = None
+    if args.url:
+        host, port = args.url.rsplit(":", 1)
+        port = int(port)
+    else:
+        process, host, port = start_server()
+    try:
+        payloads = [_request(host, path, body) for path, body in bodies]
+        # Aquecimento: uma passada por todas as builds preenche o cache
+        asyncio.run(run_load(host, port, payloads, len(payloads), min(args.concurrency, len(payloads))))
+        result = asyncio.run(run_load(host, port, payloads, args.requests, args.concurrency))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    builds = result["requests"] * (args.batch or 1)
+    print(f"{result['requests']} pedidos em {result['seconds']:.2f}s: {result['rps']:.0f} pedidos/s "
+          f"({builds / result['seconds']:.0f} builds/s), p50 {result['p50_ms']:.2f} ms, "
+          f"p99 {result['p99_ms']:.2f} ms, erros {result['errors']}")
+    return 1 if result["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
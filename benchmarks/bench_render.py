@@ -0,0 +1,69 @@
+import os
+import sys
+import time
+
+import pandas as pd
+from streamlit.elements.lib.pandas_styler_utils import marshall_styler
+from streamlit.dataframe_util import convert_pandas_df_to_arrow_bytes
+from streamlit.proto.ArrowData_pb2 import ArrowData as ArrowDataProto
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine import ELEMENTS  # noqa: E402
+from render import COLORS, TECH_FORMAT, create_tech_df, render_table  # noqa: E402
+
+ROW_COUNTS = [10, 100, 1000]
+REPEATS = 5
+ATTRIBUTES = (60, 30, 80, 40, 30)
+
+
+# ===== CAMINHO ANTIGO (Styler linha a linha) =====
+def style_element(row):
+    nome_elemento = row["Elemento"].split(" ", 1)[-1]  # Remove emoji
+    color = COLORS.get(nome_elemento, "#FFFFFF")
+    return [f"background-color: {color}; color: #000000" for _ in row]
+
+
+def render_before(df):
+    styler = df.style.apply(style_element, axis=1).format(TECH_FORMAT)
+    proto = ArrowDataProto()
+    marshall_styler(proto, styler, "bench")
+    proto.data = convert_pandas_df_to_arrow_bytes(df)
+
+
+# ===== CAMINHO NOVO =====
+def render_after(df, mode):
+    data, _ = render_table(df, mode)
+    proto = ArrowDataProto()
+    if mode == "colorido":
+        marshall_styler(proto, data, "bench")
+        data = data.data
+    proto.data = convert_pandas_df_to_arrow_bytes(data)
+
+
+def sample_frame(rows):
+    base = create_tech_df(list(ELEMENTS) + ["Common"], ATTRIBUTES)
+    return pd.concat([base] * (rows // len(base) + 1), ignore_index=True).head(rows)
+
+
+def best_of(fn, *args):
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        fn(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def main():
+    print(f"{'linhas':>7} {'antes (ms)':>12} {'colorido (ms)':>14} {'rápido (ms)':>12}")
+    for rows in ROW_COUNTS:
+        df = sample_frame(rows)
+        before = best_of(render_before, df)
+        colored = best_of(render_after, df, "colorido")
+        fast = best_of(render_after, df, "rapido")
+        print(f"{rows:>7} {before:>12.2f} {colored:>14.2f} {fast:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
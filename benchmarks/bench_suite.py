@@ -0,0 +1,335 @@
+import argparse
+import atexit
+import functools
+import http.server
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, ROOT_DIR)
+
+# Isola caches e banco de builds antes de importar o app (as instâncias são criadas no import)
+_TMP_DIR = tempfile.mkdtemp(prefix="ninoff-bench-")
+atexit.register(shutil.rmtree, _TMP_DIR, ignore_errors=True)
+os.environ["NINOFF_ASSET_CACHE"] = os.path.join(_TMP_DIR, "assets")
+os.environ["NINOFF_BUILD_DB"] = os.path.join(_TMP_DIR, "builds.db")
+
+import numpy as np  # noqa: E402
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+from bench_render import render_after, render_before  # noqa: E402
+from engine import (  # noqa: E402
+    ATTRIBUTES, BASE_MIN, CHARMS, ELEMENTS, MAX_POINTS, apply_bonuses, calculate_level, final_attributes_array,
+    level_for_points, load_game_data
+)
+from instrumentation import metrics  # noqa: E402
+from render import create_tech_df  # noqa: E402
+
+# ===== CONFIGURAÇÃO =====
+APP_PATH = os.path.join(ROOT_DIR, "Metanin.py")
+BASELINE_PATH = os.path.join(BENCH_DIR, "baseline.json")
+CREDITS_IMAGE = os.path.join(ROOT_DIR, "assets", "creditos_fallback.png")
+DEFAULT_THRESHOLD = 0.25  # 25% mais lento que a baseline = regressão
+E2E_THRESHOLD = 0.40  # reruns completos variam mais (threads do Streamlit, GC)
+MIN_DELTA_MS = 0.05  # diferenças menores que isso são ruído, mesmo em porcentagem alta
+MICRO_REPEATS = 30
+E2E_REPEATS = 7
+APP_TIMEOUT = 60
+SAMPLE_ATTRIBUTES = (60, 30, 80, 40, 30)
+# Fragmentos que toda mudança de atributo reexecuta (BUILD_FRAGMENTS em Metanin.py) e o que um
+# rerun completo registra; as tabelas de técnicas entram só quando o atributo as escala
+ATTRIBUTE_FRAGMENTS = ["status", "atributos", "curva_dps", "rotacao", "versoes"]
+FULL_RERUN = ["rerun.total", "status", "atributos", "tecnicas", "curva_dps", "comuns", "rotacao", "versoes"]
+
+
+# ===== MEDIÇÃO =====
+def wall_ms(fn):
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000
+
+
+def measure(fn, repeats, setup=None, timer=wall_ms):
+    # Uma execução de aquecimento antes das medidas. A comparação usa o melhor tempo (como em
+    # bench_render), que sofre menos com ruído da máquina; a mediana fica registrada junto.
+    # setup roda antes de cada execução, fora do tempo medido
+    if setup is not None:
+        setup()
+    fn()
+    timings = []
+    for _ in range(repeats):
+        if setup is not None:
+            setup()
+        timings.append(timer(fn))
+    return {"median_ms": statistics.median(timings), "min_ms": min(timings), "repeats": repeats}
+
+
+# ===== MICRO-BENCHMARKS =====
+def micro_benchmarks(repeats):
+    data = load_game_data()
+    sections = {}
+
+    sections["micro.calculate_level"] = measure(
+        lambda: [calculate_level(p) for p in range(MAX_POINTS + 1)], repeats)
+    all_points = np.arange(MAX_POINTS + 1)
+    sections["micro.level_for_points"] = measure(lambda: level_for_points(all_points), repeats)
+
+    bases = range(5, MAX_POINTS + 6, 5)
+    sections["micro.apply_bonuses"] = measure(
+        lambda: [apply_bonuses(base, charm, 10, attr, 25, data)
+                 for charm in CHARMS for attr in ATTRIBUTES for base in bases], repeats)
+    # Mesma grade pelo pipeline de modificadores em lote: uma chamada por charm
+    base_grid = np.repeat(np.array(bases)[:, None], len(ATTRIBUTES), axis=1)
+    sections["micro.final_attributes_array"] = measure(
+        lambda: [final_attributes_array(base_grid, data.charm_codes[charm], 10, 25, data) for charm in CHARMS], repeats)
+
+    for element in list(ELEMENTS) + ["Common"]:
+        sections[f"micro.create_tech_df.{element}"] = measure(
+            functools.partial(create_tech_df, (element,), SAMPLE_ATTRIBUTES), repeats)
+
+    df = create_tech_df(list(ELEMENTS) + ["Common"], SAMPLE_ATTRIBUTES)
+    sections["micro.style_pass.style_element"] = measure(functools.partial(render_before, df), repeats)
+    sections["micro.style_pass.colorido"] = measure(functools.partial(render_after, df, "colorido"), repeats)
+    sections["micro.style_pass.rapido"] = measure(functools.partial(render_after, df, "rapido"), repeats)
+    return sections
+
+
+# ===== PONTA A PONTA (AppTest) =====
+class _QuietHandler(http.server.SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+def serve_credits_image():
+    # Servidor local no lugar do Discord: a imagem de créditos nunca sai da máquina
+    handler = functools.partial(_QuietHandler, directory=os.path.dirname(CREDITS_IMAGE))
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    os.environ["NINOFF_CREDITS_URL"] = f"http://127.0.0.1:{server.server_port}/{os.path.basename(CREDITS_IMAGE)}"
+    return server
+
+
+def _check(app):
+    if app.exception:
+        raise RuntimeError(f"Metanin.py falhou no AppTest: {app.exception[0].value}")
+    return app
+
+
+def _fresh_app():
+    return _check(AppTest.from_file(APP_PATH, default_timeout=APP_TIMEOUT).run())
+
+
+def _script_spans():
+    # (execuções, segundos) por fragmento (spans "fragmento.*") e do rerun completo ("rerun.total");
+    # o AppTest roda o script neste processo, então as métricas do app são as de instrumentation
+    return {name: (stats["count"], stats["sum"]) for name, stats in metrics.snapshot().items()
+            if name.startswith("fragmento.") or name == "rerun.total"}
+
+
+def _script_run(action):
+    # Roda action e retorna (seções reexecutadas, ms de script). O tempo é o do próprio app:
+    # rerun.total num rerun completo, a soma dos fragmentos num rerun parcial. O run() do AppTest
+    # soma dezenas de ms de espera por polling, que esconderiam a diferença entre os dois
+    before = _script_spans()
+    action()
+    after = _script_spans()
+    ran = {name for name in after if after[name][0] != before.get(name, (0, 0.0))[0]}
+    seconds = {name: after[name][1] - before.get(name, (0, 0.0))[1] for name in ran}
+    if "rerun.total" in ran:
+        elapsed = seconds["rerun.total"]
+    else:
+        elapsed = sum(seconds.values())
+    return {name.removeprefix("fragmento.") for name in ran}, elapsed * 1000
+
+
+def script_ms(action):
+    return _script_run(action)[1]
+
+
+def _expect_runs(action, expected):
+    # expected: fragmentos sem o prefixo "fragmento.", mais "rerun.total" num rerun completo
+    ran, _ = _script_run(action)
+    if ran != set(expected):
+        raise RuntimeError(f"Esperava reexecutar {sorted(expected)}, reexecutou {sorted(ran)}")
+
+
+def e2e_benchmarks(repeats):
+    server = serve_credits_image()
+    sections = {}
+    try:
+        sections["e2e.first_run"] = measure(_fresh_app, repeats)
+
+        app = _fresh_app()
+
+        def restore(**state):
+            # Depois de um rerun de fragmento o AppTest só conhece a árvore parcial, e o próximo
+            # run() recria os widgets de fora dela com o valor padrão. Antes de cada medida um rerun
+            # completo (fora do tempo) devolve a árvore inteira, com o estado vindo do session_state
+            for key, value in state.items():
+                app.session_state[key] = value
+            _check(app.run())
+
+        def change_attribute(key):
+            # +1 ponto a partir do mínimo: não muda o nível, como um clique no number_input
+            app.number_input(key=key).set_value(BASE_MIN + 1)
+            _check(app.run())
+
+        # STR escala técnicas de Wind (par padrão Fire + Wind): reexecuta a tabela; FRT não escala nenhuma
+        for name, key, tables in (("e2e.rerun_attribute", "str_base", ["tecnicas"]),
+                                  ("e2e.rerun_attribute_no_table", "frt_base", [])):
+            setup = functools.partial(restore, **{key: BASE_MIN, "show_common": False})
+            setup()
+            _expect_runs(functools.partial(change_attribute, key), ATTRIBUTE_FRAGMENTS + tables)
+            sections[name] = measure(functools.partial(change_attribute, key), repeats, setup, script_ms)
+
+        def toggle_common():
+            app.toggle(key="show_common").set_value(True)
+            _check(app.run())
+
+        setup = functools.partial(restore, show_common=False)
+        setup()
+        _expect_runs(toggle_common, ["comuns"])
+        sections["e2e.rerun_common_toggle"] = measure(toggle_common, repeats, setup, script_ms)
+
+        restore(show_common=False)
+
+        def change_elements():
+            primary = next(s for s in app.selectbox if s.label == "Primário")
+            primary.set_value(ELEMENTS[(ELEMENTS.index(primary.value) + 1) % len(ELEMENTS)])
+            _check(app.run())
+
+        _expect_runs(change_elements, FULL_RERUN)
+        sections["e2e.rerun_elements"] = measure(change_elements, repeats, timer=script_ms)
+
+        next(t for t in app.toggle if t.label == "Calcular fronteira").set_value(True)
+        _check(app.run())
+
+        def pareto_rerun():
+            # Alterna entre dois níveis de guild: depois do aquecimento as fatias vêm do cache
+            guild = next(s for s in app.slider if s.label == "Guild Level Status")
+            guild.set_value(1 - guild.value)
+            _check(app.run())
+            if not next(t for t in app.toggle if t.label == "Calcular fronteira").value:
+                raise RuntimeError("A fronteira de Pareto foi desligada durante a medida")
+
+        sections["e2e.rerun_pareto"] = measure(pareto_rerun, repeats, timer=script_ms)
+    finally:
+        server.shutdown()
+    return sections
+
+
+# ===== BASELINE =====
+def load_baseline(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_baseline(path, sections, threshold):
+    baseline = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "created_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "data_version": load_game_data().version,
+        },
+        "threshold": threshold,
+        "min_delta_ms": MIN_DELTA_MS,
+        # Limites por seção, para as mais ruidosas; editáveis à mão
+        "thresholds": {name: E2E_THRESHOLD for name in sections if name.startswith("e2e.")},
+        "sections": sections,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(baseline, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+
+
+def compare(baseline, sections, threshold=None):
+    # Retorna (linhas do relatório, houve regressão)
+    default = baseline.get("threshold", DEFAULT_THRESHOLD) if threshold is None else threshold
+    min_delta = baseline.get("min_delta_ms", MIN_DELTA_MS)
+    rows, failed = [], False
+    for name, current in sections.items():
+        reference = baseline["sections"].get(name)
+        if reference is None:
+            rows.append((name, None, current["min_ms"], None, "nova"))
+            continue
+        limit = baseline.get("thresholds", {}).get(name, default)
+        before, after = reference["min_ms"], current["min_ms"]
+        change = (after - before) / before if before else 0.0
+        if change > limit and after - before > min_delta:
+            status, failed = f"REGRESSÃO (> {limit:.0%})", True
+        elif change < -limit and before - after > min_delta:
+            status = "melhorou"
+        else:
+            status = "ok"
+        rows.append((name, before, after, change, status))
+    for name in baseline["sections"]:
+        if name not in sections:
+            rows.append((name, baseline["sections"][name]["min_ms"], None, None, "ausente"))
+    return rows, failed
+
+
+def print_report(rows):
+    width = max(len(row[0]) for row in rows)
+    print(f"{'seção':<{width}} {'baseline (ms)':>14} {'atual (ms)':>11} {'variação':>9}  status")
+    for name, before, after, change, status in rows:
+        before = f"{before:.3f}" if before is not None else "-"
+        after = f"{after:.3f}" if after is not None else "-"
+        change = f"{change:+.1%}" if change is not None else "-"
+        print(f"{name:<{width}} {before:>14} {after:>11} {change:>9}  {status}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks do Nin0ff-Meta com comparação contra baseline")
+    parser.add_argument("--only", choices=["micro", "e2e"], help="roda só um grupo de seções")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="arquivo JSON da baseline")
+    parser.add_argument("--save", action="store_true", help="grava os resultados como nova baseline")
+    parser.add_argument("--threshold", type=float, help="limite relativo de regressão (padrão: o da baseline)")
+    parser.add_argument("--micro-repeats", type=int, default=MICRO_REPEATS)
+    parser.add_argument("--e2e-repeats", type=int, default=E2E_REPEATS)
+    parser.add_argument("--json", help="também grava os resultados desta execução neste arquivo")
+    args = parser.parse_args(argv)
+
+    sections = {}
+    if args.only in (None, "micro"):
+        sections.update(micro_benchmarks(args.micro_repeats))
+    if args.only in (None, "e2e"):
+        sections.update(e2e_benchmarks(args.e2e_repeats))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(sections, f, indent=2)
+
+    if args.save:
+        save_baseline(args.baseline, sections, args.threshold or DEFAULT_THRESHOLD)
+        print(f"Baseline gravada em {args.baseline}")
+        print_report([(name, None, s["min_ms"], None, "gravada") for name, s in sections.items()])
+        return 0
+
+    baseline = load_baseline(args.baseline)
+    if baseline is None:
+        print(f"Sem baseline em {args.baseline}; rode com --save para criar")
+        print_report([(name, None, s["min_ms"], None, "-") for name, s in sections.items()])
+        return 0
+
+    if args.only:
+        baseline["sections"] = {k: v for k, v in baseline["sections"].items() if k.startswith(args.only + ".")}
+    rows, failed = compare(baseline, sections, args.threshold)
+    print_report(rows)
+    if failed:
+        print("\nFalhou: há seções mais lentas que a baseline além do limite")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
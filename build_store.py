@@ -0,0 +1,271 @@
+import hashlib
+import json
+import math
+import operator
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from engine import ATTRIBUTES, BASE_MIN, MAX_BASE, MAX_GUILD_LEVEL, NO_CHARM, evaluate_builds, resolve
+
+# ===== CONFIGURAÇÃO =====
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DB_PATH = os.environ.get("NINOFF_BUILD_DB", os.path.join(BASE_DIR, "builds.db"))
+RESULT_CACHE_SIZE = 4096
+SQL_CHUNK = 900  # SQLite limita o número de parâmetros por consulta
+LIST_LIMIT = 500  # builds por página em list_builds
+
+CONFIG_FIELDS = ["primary", "secondary", "charm", "faction", "guild_level", "weapon"]
+COLUMNS = [attr.lower() for attr in ATTRIBUTES] + [
+    "primary_element", "secondary_element", "charm", "faction", "guild_level", "weapon"
+]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS builds (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    hash TEXT NOT NULL,
+    str INTEGER NOT NULL,
+    frt INTEGER NOT NULL,
+    int INTEGER NOT NULL,
+    agi INTEGER NOT NULL,
+    chk INTEGER NOT NULL,
+    primary_element TEXT NOT NULL,
+    secondary_element TEXT NOT NULL,
+    charm TEXT NOT NULL,
+    faction TEXT NOT NULL,
+    guild_level INTEGER NOT NULL,
+    weapon TEXT,
+    data_version TEXT,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_builds_elements ON builds (primary_element, secondary_element);
+CREATE INDEX IF NOT EXISTS idx_builds_weapon ON builds (weapon);
+CREATE INDEX IF NOT EXISTS idx_builds_hash ON builds (hash);
+"""
+
+
+# ===== NORMALIZAÇÃO =====
+def _integer(name, value):
+    # Inteiros, floats sem parte fracionária (JSON) e texto com dígitos (CSV); int() sozinho truncaria
+    # 12.99 para 12 e aceitaria True como 1
+    if isinstance(value, bool):
+        raise ValueError(f"{name} deve ser um número inteiro: {value!r}")
+    if isinstance(value, float):
+        if math.isinf(value):
+            raise OverflowError(name)
+        if not value.is_integer():
+            raise ValueError(f"{name} deve ser um número inteiro: {value!r}")
+        return int(value)
+    if isinstance(value, str):
+        try:
+            return int(value.strip())
+        except ValueError:
+            raise ValueError(f"{name} deve ser um número inteiro: {value!r}") from None
+    try:
+        return operator.index(value)
+    except TypeError:
+        raise ValueError(f"{name} deve ser um número inteiro: {value!r}") from None
+
+
+def normalize_config(config):
+    # Mesmo formato plano de evaluate_build, com os padrões preenchidos
+    normalized = {attr: _integer(attr, config.get(attr, BASE_MIN)) for attr in ATTRIBUTES}
+    normalized.update({
+        "primary": config["primary"],
+        "secondary": config["secondary"],
+        "charm": config.get("charm") or NO_CHARM,
+        "faction": config.get("faction") or "Nenhuma",
+        "guild_level": _integer("guild_level", config.get("guild_level", 0)),
+        "weapon": config.get("weapon") or None,
+    })
+    return normalized
+
+
+def validate_config(config, data=None):
+    # normalize_config mais a checagem contra os dados e os limites do jogo (buscas em dicionário e
+    # comparações), para que uma build inválida seja recusada sozinha antes de entrar num lote de
+    # evaluate_builds: valores fora dos limites estourariam o int64 do lote ou dariam números sem sentido
+    data = resolve(data)
+    try:
+        normalized = normalize_config(config)
+    except OverflowError:
+        raise ValueError("valor numérico fora do intervalo") from None
+    for attr in ATTRIBUTES:
+        if not BASE_MIN <= normalized[attr] <= MAX_BASE:
+            raise ValueError(f"{attr} fora do intervalo {BASE_MIN}-{MAX_BASE}: {normalized[attr]}")
+    if not 0 <= normalized["guild_level"] <= MAX_GUILD_LEVEL:
+        raise ValueError(f"guild_level fora do intervalo 0-{MAX_GUILD_LEVEL}: {normalized['guild_level']}")
+    for key in ("primary", "secondary"):
+        if normalized[key] not in data.elements:
+            raise ValueError(f"Elemento desconhecido: {normalized[key]}")
+    if normalized["primary"] == normalized["secondary"]:
+        raise ValueError(f"Elementos primário e secundário iguais: {normalized['primary']}")
+    for label, value, known in (("Charm", normalized["charm"], data.charm_codes),
+                                ("Facção", normalized["faction"], data.faction_codes)):
+        if value not in known:
+            raise ValueError(f"{label} desconhecido: {value}")
+    if normalized["weapon"] is not None and normalized["weapon"] not in data.weapon_codes:
+        raise ValueError(f"Arma desconhecida: {normalized['weapon']}")
+    return normalized
+
+
+def build_hash(config):
+    # Identidade da build: só o que afeta o cálculo (o nome fica de fora)
+    payload = json.dumps(normalize_config(config), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _row_to_config(row):
+    config = {attr: row[attr.lower()] for attr in ATTRIBUTES}
+    config.update({
+        "primary": row["primary_element"], "secondary": row["secondary_element"], "charm": row["charm"],
+        "faction": row["faction"], "guild_level": row["guild_level"], "weapon": row["weapon"],
+    })
+    return config
+
+
+# ===== BIBLIOTECA =====
+class BuildLibrary:
+    def __init__(self, path=DB_PATH, cache_size=RESULT_CACHE_SIZE):
+        self.path = path
+        self.cache_size = cache_size
+        self._conn = None
+        self._lock = threading.Lock()
+        self._cache_lock = threading.Lock()
+        self._results = OrderedDict()  # (hash da build, hash dos dados) -> resultado de evaluate
+
+    def _connection(self):
+        # Uma conexão por processo, compartilhada entre as sessões do Streamlit sob o lock
+        if self._conn is None:
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    # ===== ESCRITA =====
+    def save_many(self, builds, data_version=None):
+        # builds: dicts com "name" e a configuração plana; retorna os ids na mesma ordem
+        now = time.time()
+        rows = []
+        for build in builds:
+            config = normalize_config(build)
+            rows.append([build["name"], build_hash(config)] + [config[attr] for attr in ATTRIBUTES] +
+                        [config[field] for field in CONFIG_FIELDS] + [data_version, now])
+        placeholders = ", ".join("?" * (len(COLUMNS) + 4))
+        sql = f"INSERT INTO builds (name, hash, {', '.join(COLUMNS)}, data_version, created_at) VALUES ({placeholders})"
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                ids = [conn.execute(sql, row).lastrowid for row in rows]
+        return ids
+
+    def save(self, name, config, data_version=None):
+        return self.save_many([{**config, "name": name}], data_version)[0]
+
+    def delete(self, ids):
+        ids = list(ids)
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                for start in range(0, len(ids), SQL_CHUNK):
+                    chunk = ids[start:start + SQL_CHUNK]
+                    conn.execute(f"DELETE FROM builds WHERE id IN ({', '.join('?' * len(chunk))})", chunk)
+
+    # ===== LEITURA =====
+    def _filters(self, primary, secondary, weapon, name):
+        # Filtros exatos batem nos índices (par de elementos, arma); o nome é busca por trecho
+        where, params = [], []
+        for column, value in (("primary_element", primary), ("secondary_element", secondary), ("weapon", weapon)):
+            if value is not None:
+                where.append(f"{column} = ?")
+                params.append(value)
+        if name:
+            escaped = name.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            where.append("name LIKE ? ESCAPE '\\'")
+            params.append(f"%{escaped}%")
+        return (" WHERE " + " AND ".join(where) if where else ""), params
+
+    def list_builds(self, primary=None, secondary=None, weapon=None, name=None, limit=LIST_LIMIT, offset=0):
+        # Uma página das builds que passam nos filtros, mais recentes primeiro
+        where, params = self._filters(primary, secondary, weapon, name)
+        sql = f"SELECT * FROM builds{where} ORDER BY id DESC LIMIT ? OFFSET ?"
+        with self._lock:
+            rows = self._connection().execute(sql, params + [limit, offset]).fetchall()
+        return [{"id": row["id"], "name": row["name"], "hash": row["hash"],
+                 "data_version": row["data_version"], **_row_to_config(row)} for row in rows]
+
+    def get_many(self, ids):
+        ids = list(dict.fromkeys(ids))
+        rows = {}
+        with self._lock:
+            conn = self._connection()
+            for start in range(0, len(ids), SQL_CHUNK):
+                chunk = ids[start:start + SQL_CHUNK]
+                for row in conn.execute(f"SELECT * FROM builds WHERE id IN ({', '.join('?' * len(chunk))})", chunk):
+                    rows[row["id"]] = row
+        return [{"id": i, "name": rows[i]["name"], "hash": rows[i]["hash"],
+                 "data_version": rows[i]["data_version"], **_row_to_config(rows[i])} for i in ids if i in rows]
+
+    def count(self, primary=None, secondary=None, weapon=None, name=None):
+        where, params = self._filters(primary, secondary, weapon, name)
+        with self._lock:
+            return self._connection().execute(f"SELECT COUNT(*) FROM builds{where}", params).fetchone()[0]
+
+    # ===== COMPARAÇÃO =====
+    def evaluate(self, builds, data=None):
+        # Uma única chamada em lote para as builds que ainda não estão no cache
+        data = resolve(data)
+        keys = [(build["hash"], data.hash) for build in builds]
+        with self._cache_lock:
+            found, missing = {}, {}
+            for key, build in zip(keys, builds):
+                if key in self._results:
+                    self._results.move_to_end(key)
+                    found[key] = self._results[key]
+                else:
+                    missing.setdefault(key, build)
+
+            if missing:
+                batch = evaluate_builds(list(missing.values()), data=data)
+                for i, key in enumerate(missing):
+                    found[key] = self._results[key] = batch.build(i)
+                while len(self._results) > self.cache_size:
+                    self._results.popitem(last=False)
+        return [found[key] for key in keys]
+
+    def compare(self, ids, data=None):
+        builds = self.get_many(ids)
+        results = self.evaluate(builds, data)
+        rows = []
+        for build, result in zip(builds, results):
+            row = {
+                "Build": build["name"],
+                "Elementos": f"{build['primary']} + {build['secondary']}",
+                "Charm": build["charm"],
+                "Facção": build["faction"],
+                "Guild": build["guild_level"],
+                "Arma": build["weapon"] or "-",
+            }
+            row.update({attr: result["attributes"][attr] for attr in ATTRIBUTES})
+            row["Nível"] = result["level"]
+            row["Dano da Arma"] = result["weapon"]["damage"] if result["weapon"] else 0.0
+            row["Requisitos"] = bool(result["weapon"] and result["weapon"]["meets_requirements"])
+            row["Melhor Técnica"] = max((t["damage"] for t in result["techniques"]), default=0.0)
+            row["DPS Total"] = sum(t["dps"] for t in result["techniques"])
+            rows.append(row)
+        return rows
+
+    def clear_cache(self):
+        with self._cache_lock:
+            self._results.clear()
+
+
+# Instância compartilhada pelo processo
+build_library = BuildLibrary()
@@ -0,0 +1,259 @@
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import numpy as np
+
+from build_store import validate_config
+from engine import ATTRIBUTES, evaluate_builds, resolve
+
+# ===== CONFIGURAÇÃO =====
+CHUNK_SIZE = 20_000  # registros por lote; a memória fica limitada a alguns lotes por worker
+TOP_TECHNIQUES = 3
+FORMATS = ("csv", "jsonl")
+# Nomes aceitos nas colunas do CSV / chaves do JSONL, além dos da configuração plana
+ALIASES = {attr.lower(): attr for attr in ATTRIBUTES}
+ALIASES.update({"primary_element": "primary", "secondary_element": "secondary"})
+PASSTHROUGH = ("id", "name")  # copiados para a saída para casar resultado e entrada
+JSON_ENCODER = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"), check_circular=False)
+
+
+# ===== ENTRADA =====
+def _detect_format(path, fmt):
+    if fmt:
+        return fmt
+    if path and path != "-" and os.path.splitext(path)[1].lower() == ".csv":
+        return "csv"
+    return "jsonl"
+
+
+def _canonical(record):
+    # Célula vazia ou null = valor padrão de normalize_config
+    return {ALIASES.get(key, key): value for key, value in record.items() if value != "" and value is not None}
+
+
+def parse_records(records, fmt, header=None):
+    # Converte registros (listas de campos do CSV ou linhas do JSONL) em (configuração, erro);
+    # a posição é mantida para casar com a entrada
+    for record in records:
+        try:
+            if fmt == "csv":
+                record = dict(zip(header, record))
+            else:
+                record = json.loads(record)
+                if not isinstance(record, dict):
+                    raise ValueError("cada linha do JSONL deve ser um objeto")
+            yield _canonical(record), None
+        except ValueError as e:
+            yield None, str(e)
+
+
+def read_chunks(stream, fmt, chunk_size=CHUNK_SIZE):
+    # Gera (número do primeiro registro, registros) sem carregar o arquivo inteiro. O CSV é
+    # dividido por registro do csv.reader, não por linha: um campo entre aspas com quebra de linha
+    # fica inteiro no mesmo lote. Linhas em branco não contam como registro
+    header = None
+    if fmt == "csv":
+        records = (record for record in csv.reader(stream) if record)
+        header = next(records, None)
+        if not header:
+            return None, iter(())
+    else:
+        records = (line for line in stream if line.strip())
+
+    def chunks():
+        start = 1
+        while True:
+            batch = list(islice(records, chunk_size))
+            if not batch:
+                return
+            yield start, batch
+            start += len(batch)
+    return header, chunks()
+
+
+# ===== AVALIAÇÃO =====
+# Mesmos números da página: evaluate_builds reproduz apply_bonuses e calculate_level em lote
+def score_chunk(records, data=None, top=TOP_TECHNIQUES):
+    # records: configurações já canônicas. Cada linha é validada antes (buscas em dicionário) para
+    # que uma linha inválida vire erro sozinha e o resto do lote siga em uma chamada de evaluate_builds
+    data = resolve(data)
+    configs, results = [], []
+    for record in records:
+        try:
+            configs.append(_validated(record, data))
+            results.append(None)
+        except (KeyError, TypeError, ValueError) as e:
+            results.append({"error": _error_message(e)})
+    scored = iter(_score(configs, data, top) if configs else [])
+    return [result if result is not None else next(scored) for result in results]
+
+
+def _validated(record, data):
+    config = validate_config(record, data)
+    for key in PASSTHROUGH:
+        if key in record:
+            config[key] = record[key]
+    return config
+
+
+def _score(records, data, top):
+    batch = evaluate_builds(records, data=data)
+    techniques = data.techniques
+    damage = np.where(np.isnan(batch.tech_damage), -np.inf, batch.tech_damage)
+    order = np.argsort(-damage, axis=1, kind="stable")[:, :top]
+    top_index = np.take_along_axis(batch.tech_index, order, axis=1)
+    top_damage = np.take_along_axis(batch.tech_damage, order, axis=1)
+    top_dps = np.take_along_axis(batch.tech_dps, order, axis=1)
+
+    # Conversão para tipos do Python uma vez por lote (tolist), não elemento a elemento
+    names = list(techniques.names)
+    weapon_names = list(data.weapon_names)
+    columns = zip(
+        batch.attributes.tolist(), batch.level.tolist(), batch.points_spent.tolist(),
+        batch.remaining_points.tolist(), batch.weapon.tolist(), np.round(batch.weapon_damage, 2).tolist(),
+        batch.meets_requirements.tolist(), top_index.tolist(), np.round(top_damage, 2).tolist(),
+        np.round(top_dps, 2).tolist(),
+    )
+    results = []
+    for record, (attrs, level, spent, remaining, weapon, weapon_damage, meets, t_index, t_damage, t_dps) in zip(records, columns):
+        result = {key: record[key] for key in PASSTHROUGH if key in record}
+        result["attributes"] = dict(zip(ATTRIBUTES, attrs))
+        result["level"] = level
+        result["points_spent"] = spent
+        result["remaining_points"] = remaining
+        result["weapon"] = None if weapon < 0 else {
+            "name": weapon_names[weapon], "damage": weapon_damage, "meets_requirements": meets,
+        }
+        result["techniques"] = [
+            {"name": names[t], "damage": d, "dps": p} for t, d, p in zip(t_index, t_damage, t_dps) if t >= 0
+        ]
+        results.append(result)
+    return results
+
+
+def _error_message(error):
+    if isinstance(error, KeyError):
+        return f"campo obrigatório ausente: {error.args[0]}"
+    return str(error)
+
+
+# ===== SAÍDA =====
+def csv_columns(top=TOP_TECHNIQUES):
+    columns = ["row", *PASSTHROUGH, *ATTRIBUTES, "level", "points_spent", "remaining_points",
+               "weapon", "weapon_damage", "meets_requirements"]
+    for k in range(1, top + 1):
+        columns += [f"top{k}", f"top{k}_damage", f"top{k}_dps"]
+    return columns + ["error"]
+
+
+def _flatten(result, top):
+    row = {key: result.get(key) for key in ("row", *PASSTHROUGH, "error")}
+    if "error" in result:
+        return row
+    row.update(result["attributes"])
+    row.update({key: result[key] for key in ("level", "points_spent", "remaining_points")})
+    if result["weapon"]:
+        row.update({"weapon": result["weapon"]["name"], "weapon_damage": result["weapon"]["damage"],
+                    "meets_requirements": result["weapon"]["meets_requirements"]})
+    for k, technique in enumerate(result["techniques"][:top], start=1):
+        row.update({f"top{k}": technique["name"], f"top{k}_damage": technique["damage"],
+                    f"top{k}_dps": technique["dps"]})
+    return row
+
+
+def format_results(results, fmt, top=TOP_TECHNIQUES):
+    if fmt == "jsonl":
+        return "".join(JSON_ENCODER.encode(r) + "\n" for r in results)
+    out = io.StringIO()
+    writer = csv.DictWriter(out, csv_columns(top), lineterminator="\n")
+    writer.writerows(_flatten(r, top) for r in results)
+    return out.getvalue()
+
+
+# ===== PIPELINE =====
+def process_chunk(args):
+    # Roda num worker ou no processo principal: parse, avaliação e serialização do lote.
+    # Os workers recebem só o nome da versão e carregam os dados uma vez por processo
+    start, records, in_format, header, out_format, version, top = args
+    data = resolve(version)
+    parsed = list(parse_records(records, in_format, header))
+    valid = [config for config, error in parsed if error is None]
+    scored = iter(score_chunk(valid, data, top) if valid else [])
+    results = []
+    for offset, (config, error) in enumerate(parsed):
+        result = {"error": error} if error is not None else next(scored)
+        results.append({"row": start + offset, **result})
+    errors = sum("error" in r for r in results)
+    return format_results(results, out_format, top), len(results), errors
+
+
+def run(stream, out, in_format="jsonl", out_format="jsonl", workers=None, chunk_size=CHUNK_SIZE,
+        top=TOP_TECHNIQUES, data=None):
+    # Resultados saem na ordem da entrada, lote a lote; no máximo 2 lotes por worker em voo
+    version = resolve(data).version
+    header, chunks = read_chunks(stream, in_format, chunk_size)
+    if out_format == "csv":
+        out.write(",".join(csv_columns(top)) + "\n")
+    tasks = ((start, records, in_format, header, out_format, version, top) for start, records in chunks)
+    total = errors = 0
+    workers = os.cpu_count() if workers == 0 else workers
+    if not workers or workers <= 1:
+        for text, rows, failed in map(process_chunk, tasks):
+            out.write(text)
+            total, errors = total + rows, errors + failed
+        return total, errors
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for task in tasks:
+            pending.append(pool.submit(process_chunk, task))
+            if len(pending) >= workers * 2:
+                text, rows, failed = pending.popleft().result()
+                out.write(text)
+                total, errors = total + rows, errors + failed
+        while pending:
+            text, rows, failed = pending.popleft().result()
+            out.write(text)
+            total, errors = total + rows, errors + failed
+    return total, errors
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Avalia builds em lote (CSV ou JSONL) sem a interface do Streamlit",
+        epilog="Campos: STR FRT INT AGI CHK primary secondary charm faction guild_level weapon (id e name são copiados)")
+    parser.add_argument("input", nargs="?", default="-", help="arquivo de entrada (padrão: stdin)")
+    parser.add_argument("-o", "--output", default="-", help="arquivo de saída (padrão: stdout)")
+    parser.add_argument("--format", choices=FORMATS, help="formato da entrada (padrão: pela extensão, senão jsonl)")
+    parser.add_argument("--output-format", choices=FORMATS, help="formato da saída (padrão: o mesmo da entrada)")
+    parser.add_argument("--workers", type=int, help="processos em paralelo (0 = um por CPU)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--top", type=int, default=TOP_TECHNIQUES, help="técnicas de maior dano por build")
+    parser.add_argument("--data-version", help="versão dos dados do jogo (padrão: a mais recente)")
+    args = parser.parse_args(argv)
+
+    in_format = _detect_format(args.input, args.format)
+    out_format = args.output_format or in_format
+    data = resolve(args.data_version)
+    source = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8", newline="")
+    target = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8", newline="")
+    try:
+        total, errors = run(source, target, in_format, out_format, args.workers, args.chunk_size, args.top, data)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if target is not sys.stdout:
+            target.close()
+    print(f"{total} builds avaliadas, {errors} com erro (dados {data.version})", file=sys.stderr)
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,227 @@
+from functools import lru_cache
+
+import numpy as np
+
+from game_data import (  # noqa: F401 (reexportados para os demais módulos)
+    ATTRIBUTES, COMMON_ELEMENT, MAX_LEVEL, NO_CHARM, SCALING_ATTRS, TECH_SCALING_FACTOR,
+    GameData, GameDataError, TechniqueTable, load_game_data, resolve
+)
+
+# ===== CONSTANTES =====
+MAX_POINTS = 285
+BASE_MIN = 5
+MAX_BASE = BASE_MIN + MAX_POINTS  # maior base possível num único atributo
+MAX_GUILD_LEVEL = 10
+WEAPON_SCALING_FACTOR = 0.6
+
+# ===== DADOS DO JOGO =====
+# Carregados de data/<versão>.json (ver game_data). Os nomes abaixo são a versão padrão no
+# momento do import; funções que recebem `data` aceitam outra versão ou um GameData.
+DATA = load_game_data()
+weapons_db = DATA.weapons_db
+techniques_db = DATA.techniques_db
+CHARMS = DATA.charms
+ELEMENTS = DATA.elements
+CHARM_BONUSES = DATA.charm_bonuses
+FACTION_BONUSES = DATA.faction_bonuses
+TECHNIQUES = DATA.techniques
+
+# ===== FÓRMULAS =====
+def calculate_level(total_points):
+    level, points_needed = 1, 0
+    while level <= MAX_LEVEL and points_needed <= MAX_POINTS:
+        points_per_level = 5 if level <= 50 else 4
+        points_needed += points_per_level
+        if total_points >= points_needed and points_needed <= MAX_POINTS:
+            level += 1
+        else:
+            break
+    return min(level, MAX_LEVEL)
+
+
+def calculate_available_points(level):
+    return (level - 1) * 5 if level <= 50 else (50 * 5) + ((level - 50) * 4)
+
+
+def apply_bonuses(base, charm, guild_level, attr, faction_bonus, data=None):
+    # Guild (%), charm (truncado com int()) e facção, na ordem de modifiers.STAGES
+    selections = {"guild": guild_level, "charm": charm, "faction": faction_bonus}
+    return resolve(data).modifiers.apply_one(base, attr, selections)
+
+
+# ===== PROGRESSÃO (TABELAS PRÉ-CALCULADAS) =====
+LEVEL_BY_POINTS = np.array([calculate_level(p) for p in range(MAX_POINTS + 1)])
+POINTS_BY_LEVEL = np.array([0] + [calculate_available_points(lv) for lv in range(1, MAX_LEVEL + 1)])
+# Mesmo passo usado em calculate_level (índice = nível atual, 0 no nível máximo)
+POINTS_TO_NEXT_LEVEL = np.array([0] + [5 if lv <= 50 else 4 for lv in range(1, MAX_LEVEL)] + [0])
+for _table in (LEVEL_BY_POINTS, POINTS_BY_LEVEL, POINTS_TO_NEXT_LEVEL):
+    _table.flags.writeable = False
+
+
+def level_for_points(points):
+    return LEVEL_BY_POINTS[np.clip(points, 0, MAX_POINTS)]
+
+
+def available_points_at(level):
+    return POINTS_BY_LEVEL[np.clip(level, 1, MAX_LEVEL)]
+
+
+def points_to_next_level(level):
+    return POINTS_TO_NEXT_LEVEL[np.clip(level, 1, MAX_LEVEL)]
+
+
+def final_attributes(attributes_base, charm, guild_level, faction_bonus, data=None):
+    data = resolve(data)
+    return {attr: apply_bonuses(val, charm, guild_level, attr, faction_bonus, data) for attr, val in attributes_base.items()}
+
+
+def weapon_damage(weapon_data, attributes):
+    return weapon_data["base_damage"] + (attributes[weapon_data["scaling"]] * WEAPON_SCALING_FACTOR)
+
+
+def requirement_checks(weapon_data, attributes):
+    return {req: attributes.get(req, 0) >= val for req, val in weapon_data["requirements"].items()}
+
+
+def attribute_vector(attributes):
+    return np.array([attributes[attr] for attr in ATTRIBUTES], dtype=np.float64)
+
+
+def technique_rows(element, attributes, data=None):
+    techniques = resolve(data).techniques
+    indices = techniques.indices(element)
+    damage = techniques.damage(attribute_vector(attributes), indices)
+    return [_technique_row(techniques, i, float(d)) for i, d in zip(indices, damage)]
+
+
+def _technique_row(techniques, i, damage):
+    cooldown = int(techniques.cooldown[i])
+    return {
+        "name": techniques.names[i],
+        "element": techniques.element_names[techniques.element[i]],
+        "base": int(techniques.base[i]),
+        "scaling": techniques.scaling[i],
+        "damage": damage,
+        "dps": damage / cooldown if cooldown > 0 else 0,
+        "cost": int(techniques.cost[i]),
+        "cooldown": cooldown,
+        "level": int(techniques.level[i]),
+    }
+
+
+# ===== FORMA COMPILADA (LOTE) =====
+def _codes(values, mapping, label, default=-1):
+    codes = np.fromiter((mapping.get(v, -1) if v is not None else default for v in values), dtype=np.int64)
+    if (codes == -1).any():
+        unknown = next(v for v, c in zip(values, codes) if c == -1)
+        raise ValueError(f"{label} desconhecido: {unknown}")
+    return codes
+
+
+def final_attributes_array(base, charm, guild_level, faction_bonus, data=None):
+    # base (n, 5); charm = códigos na ordem de data.charms; escalares ou vetores (n,) para o resto
+    # Mesmo pipeline de apply_bonuses, em operações de matriz sobre o lote inteiro
+    return resolve(data).modifiers.apply(base, {"guild": guild_level, "charm": charm, "faction": faction_bonus})
+
+
+def eligible_weapons(attributes, data=None):
+    # Matriz (n, armas) indicando quais armas cada build pode equipar
+    weapon_req = resolve(data).weapon_req
+    return (np.asarray(attributes)[:, None, :] >= weapon_req[None, :-1, :]).all(axis=2)
+
+
+class BatchResult:
+    def __init__(self, base, attributes, points_spent, level, remaining_points,
+                 weapon, weapon_damage, meets_requirements, tech_index, tech_damage, tech_dps, data):
+        self.data = data
+        self.base = base
+        self.attributes = attributes
+        self.points_spent = points_spent
+        self.level = level
+        self.remaining_points = remaining_points
+        self.weapon = weapon
+        self.weapon_damage = weapon_damage
+        self.meets_requirements = meets_requirements
+        self.tech_index = tech_index
+        self.tech_damage = tech_damage
+        self.tech_dps = tech_dps
+
+    def __len__(self):
+        return len(self.level)
+
+    def build(self, i):
+        attributes = {attr: int(self.attributes[i, j]) for j, attr in enumerate(ATTRIBUTES)}
+        spent = int(self.points_spent[i])
+        level = int(self.level[i])
+        weapon = None
+        if self.weapon[i] >= 0:
+            name = self.data.weapon_names[self.weapon[i]]
+            weapon = {
+                "name": name,
+                "damage": float(self.weapon_damage[i]),
+                "meets_requirements": bool(self.meets_requirements[i]),
+                "requirements": requirement_checks(self.data.weapons_db[name], attributes),
+            }
+        techniques = [
+            _technique_row(self.data.techniques, t, float(self.tech_damage[i, k]))
+            for k, t in enumerate(self.tech_index[i]) if t >= 0
+        ]
+        return {
+            "attributes": attributes,
+            "points_spent": spent,
+            "level": level,
+            "available_points": int(available_points_at(level)),
+            "points_to_next_level": int(points_to_next_level(level)),
+            "remaining_points": int(self.remaining_points[i]),
+            "over_limit": spent > MAX_POINTS,
+            "weapon": weapon,
+            "techniques": techniques,
+        }
+
+
+# ===== API =====
+def evaluate_builds(configs, include_common=False, data=None):
+    data = resolve(data)
+    techniques = data.techniques
+    configs = list(configs)
+    base = np.array([[c.get(a, BASE_MIN) for a in ATTRIBUTES] for c in configs], dtype=np.int64).reshape(-1, len(ATTRIBUTES))
+    charm = _codes([c.get("charm", NO_CHARM) for c in configs], data.charm_codes, "Charm")
+    guild = np.fromiter((c.get("guild_level", 0) for c in configs), dtype=np.float64, count=len(configs))
+    faction_bonus = data.faction_values[_codes([c.get("faction", "Nenhuma") for c in configs], data.faction_codes, "Facção")]
+    weapon = _codes([c.get("weapon") for c in configs], data.weapon_codes, "Arma", default=data.no_weapon)
+    elements = [_codes([c[key] for c in configs], techniques.element_codes, "Elemento") for key in ("primary", "secondary")]
+    if include_common:
+        elements.append(np.full(len(configs), techniques.element_codes[COMMON_ELEMENT]))
+
+    attributes = final_attributes_array(base, charm, guild, faction_bonus, data)
+
+    points_spent = base.sum(axis=1) - BASE_MIN * len(ATTRIBUTES)
+    level = level_for_points(points_spent)
+    remaining_points = np.maximum(0, available_points_at(level) - points_spent)
+
+    rows = np.arange(len(configs))
+    weapon_damage = data.weapon_base[weapon] + attributes[rows, data.weapon_scaling_idx[weapon]] * WEAPON_SCALING_FACTOR
+    meets_requirements = (attributes >= data.weapon_req[weapon]).all(axis=1)
+
+    tech_index = np.hstack([techniques.element_matrix[codes] for codes in elements])
+    tech_damage, tech_dps = techniques.gather_damage(attributes, tech_index)
+
+    return BatchResult(base, attributes, points_spent, level, remaining_points,
+                       np.where(weapon == data.no_weapon, -1, weapon), weapon_damage, meets_requirements,
+                       tech_index, tech_damage, tech_dps, data)
+
+
+def evaluate_build(config, include_common=False, data=None):
+    return evaluate_builds([config], include_common=include_common, data=data).build(0)
+
+
+@lru_cache(maxsize=512)
+def _cached_build(config_items, include_common, data_hash, data):
+    return evaluate_build(dict(config_items), include_common, data)
+
+
+def cached_evaluate_build(config, include_common=False, data=None):
+    # evaluate_build memoizado no processo: sobrevive aos reruns do Streamlit e é compartilhado
+    # entre sessões (data_hash separa versões dos dados). O dict retornado é compartilhado: não alterar
+    data = resolve(data)
+    return _cached_build(tuple(sorted(config.items())), include_common, data.hash, data)
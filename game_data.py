@@ -0,0 +1,343 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from types import MappingProxyType
+
+import numpy as np
+
+from modifiers import ModifierPipeline, ModifierSource
+
+# ===== CONSTANTES DO JOGO =====
+MAX_LEVEL = 60
+ATTRIBUTES = ["STR", "FRT", "INT", "AGI", "CHK"]
+SCALING_ATTRS = ["STR", "INT", "CHK", "AGI"]  # FRT não escala técnicas
+TECH_SCALING_FACTOR = 0.6
+GUILD_BONUS_PER_LEVEL = 0.01
+NO_CHARM = "Nenhum"
+COMMON_ELEMENT = "Common"
+
+# ===== CONFIGURAÇÃO =====
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.environ.get("NINOFF_DATA_DIR", os.path.join(BASE_DIR, "data"))
+DATA_VERSION = os.environ.get("NINOFF_DATA_VERSION")  # None = versão mais recente em DATA_DIR
+
+
+class GameDataError(ValueError):
+    pass
+
+
+# ===== VALIDAÇÃO =====
+def _is_int(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _require(condition, path, message):
+    if not condition:
+        raise GameDataError(f"{path}: {message}")
+
+
+def _check_mapping(value, path):
+    _require(isinstance(value, dict), path, "esperado um objeto")
+    return value
+
+
+def validate(raw):
+    _check_mapping(raw, "$")
+    for key in ("version", "techniques", "weapons", "charm_bonuses", "faction_bonuses"):
+        _require(key in raw, f"$.{key}", "campo obrigatório ausente")
+    _require(isinstance(raw["version"], str) and raw["version"], "$.version", "esperado um texto não vazio")
+
+    for element, techs in _check_mapping(raw["techniques"], "$.techniques").items():
+        for name, tech in _check_mapping(techs, f"$.techniques.{element}").items():
+            path = f"$.techniques.{element}.{name}"
+            _check_mapping(tech, path)
+            for field in ("base", "cost", "cooldown", "level"):
+                _require(_is_int(tech.get(field)) and tech[field] >= 0, f"{path}.{field}", "esperado inteiro >= 0")
+            _require(tech.get("scaling") in ATTRIBUTES + ["N/A"], f"{path}.scaling", "atributo inválido")
+            _require(1 <= tech["level"] <= MAX_LEVEL, f"{path}.level", f"fora de 1..{MAX_LEVEL}")
+
+    for name, weapon in _check_mapping(raw["weapons"], "$.weapons").items():
+        path = f"$.weapons.{name}"
+        _check_mapping(weapon, path)
+        _require(isinstance(weapon.get("base_damage"), (int, float)) and not isinstance(weapon.get("base_damage"), bool),
+                 f"{path}.base_damage", "esperado número")
+        _require(weapon.get("scaling") in ATTRIBUTES, f"{path}.scaling", "atributo inválido")
+        _require(isinstance(weapon.get("description", ""), str), f"{path}.description", "esperado texto")
+        for attr, value in _check_mapping(weapon.get("requirements"), f"{path}.requirements").items():
+            _require(attr in ATTRIBUTES, f"{path}.requirements.{attr}", "atributo inválido")
+            _require(_is_int(value), f"{path}.requirements.{attr}", "esperado inteiro")
+
+    _require(NO_CHARM not in raw["charm_bonuses"], f"$.charm_bonuses.{NO_CHARM}", "nome reservado")
+    for charm, bonuses in _check_mapping(raw["charm_bonuses"], "$.charm_bonuses").items():
+        for attr, value in _check_mapping(bonuses, f"$.charm_bonuses.{charm}").items():
+            _require(attr in ATTRIBUTES, f"$.charm_bonuses.{charm}.{attr}", "atributo inválido")
+            # Inteiro = bônus somado; float = bônus percentual (ex.: Libra 0.05)
+            _require(isinstance(value, (int, float)) and not isinstance(value, bool),
+                     f"$.charm_bonuses.{charm}.{attr}", "esperado número")
+
+    for faction, bonus in _check_mapping(raw["faction_bonuses"], "$.faction_bonuses").items():
+        _require(_is_int(bonus), f"$.faction_bonuses.{faction}", "esperado inteiro")
+    return raw
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    return value
+
+
+# ===== TABELA COLUNAR DE TÉCNICAS =====
+class TechniqueTable:
+    def __init__(self, techniques_db):
+        self.element_names = list(techniques_db.keys())
+        self.element_codes = {e: i for i, e in enumerate(self.element_names)}
+        rows = [(name, self.element_codes[element], data)
+                for element, techs in techniques_db.items() for name, data in techs.items()]
+
+        self.names = np.array([name for name, _, _ in rows], dtype=object)
+        self.element = np.array([code for _, code, _ in rows], dtype=np.int64)
+        self.base = np.array([data["base"] for _, _, data in rows], dtype=np.int64)
+        self.scaling = np.array([data["scaling"] for _, _, data in rows], dtype=object)
+        self.scaling_idx = np.array([ATTRIBUTES.index(s) if s in SCALING_ATTRS else -1 for s in self.scaling], dtype=np.int64)
+        self.cost = np.array([data["cost"] for _, _, data in rows], dtype=np.int64)
+        self.cooldown = np.array([data["cooldown"] for _, _, data in rows], dtype=np.int64)
+        self.level = np.array([data["level"] for _, _, data in rows], dtype=np.int64)
+
+        # Índices por elemento (busca em vez de montar um DataFrame novo)
+        self.element_index = {e: np.flatnonzero(self.element == c) for e, c in self.element_codes.items()}
+        width = max((len(v) for v in self.element_index.values()), default=0)
+        self.element_matrix = np.full((len(self.element_names), width), -1, dtype=np.int64)
+        for element, indices in self.element_index.items():
+            self.element_matrix[self.element_codes[element], :len(indices)] = indices
+
+        # Índice de desbloqueio: técnicas de cada elemento ordenadas pelo nível exigido
+        self.unlock_index = {}
+        for element, indices in self.element_index.items():
+            order = indices[np.argsort(self.level[indices], kind="stable")]
+            self.unlock_index[element] = (order, self.level[order])
+
+        for column in (self.names, self.element, self.base, self.scaling, self.scaling_idx,
+                       self.cost, self.cooldown, self.level, self.element_matrix):
+            column.flags.writeable = False
+
+    def __len__(self):
+        return len(self.names)
+
+    def indices(self, *elements):
+        return np.concatenate([self.element_index.get(e, np.empty(0, dtype=np.int64)) for e in elements])
+
+    def _unlock_slices(self, elements, start_side, end_side, level):
+        empty = np.empty(0, dtype=np.int64)
+        parts = []
+        for element in elements:
+            order, levels = self.unlock_index.get(element, (empty, empty))
+            start = 0 if start_side is None else np.searchsorted(levels, level, side=start_side)
+            parts.append(np.sort(order[start:np.searchsorted(levels, level, side=end_side)]))
+        return np.concatenate(parts) if parts else empty
+
+    def unlocked(self, level, *elements):
+        # Técnicas utilizáveis no nível (ordem original de cada elemento)
+        return self._unlock_slices(elements, None, "right", level)
+
+    def unlocking_at(self, level, *elements):
+        return self._unlock_slices(elements, "left", "right", level)
+
+    def dps_curve(self, attributes, *elements, levels=None):
+        # DPS somado das técnicas liberadas em cada nível, via soma acumulada + busca binária
+        levels = np.arange(1, MAX_LEVEL + 1) if levels is None else np.asarray(levels)
+        indices = self.indices(*elements)
+        order = indices[np.argsort(self.level[indices], kind="stable")]
+        dps = self.dps(self.damage(attributes, order), order)
+        cumulative = np.concatenate([[0.0], np.cumsum(dps, axis=-1)]) if dps.ndim == 1 else \
+            np.hstack([np.zeros((len(dps), 1)), np.cumsum(dps, axis=1)])
+        return cumulative[..., np.searchsorted(self.level[order], levels, side="right")]
+
+    def damage(self, attributes, indices=None):
+        # attributes: vetor (5,) ou matriz (n, 5) na ordem de ATTRIBUTES
+        idx = slice(None) if indices is None else indices
+        attributes = np.asarray(attributes, dtype=np.float64)
+        scaling = self.scaling_idx[idx]
+        scaled = np.where(scaling >= 0, attributes[..., np.maximum(scaling, 0)], 0)
+        return self.base[idx] + scaled * TECH_SCALING_FACTOR
+
+    def dps(self, damage, indices=None):
+        cooldown = self.cooldown[slice(None) if indices is None else indices]
+        return np.divide(damage, cooldown, out=np.zeros(np.shape(damage)), where=cooldown > 0)
+
+    def chakra_per_damage(self, damage, indices=None):
+        cost = self.cost[slice(None) if indices is None else indices]
+        return np.divide(cost, damage, out=np.full(np.shape(damage), np.nan), where=np.asarray(damage) > 0)
+
+    def gather_damage(self, attributes, tech_index):
+        # tech_index: matriz (n, k) de índices por build, -1 = vazio
+        valid = tech_index >= 0
+        safe = np.where(valid, tech_index, 0)
+        scaling = self.scaling_idx[safe]
+        scaled = np.where(scaling >= 0, np.take_along_axis(attributes, np.maximum(scaling, 0), axis=1), 0)
+        damage = np.where(valid, self.base[safe] + scaled * TECH_SCALING_FACTOR, np.nan)
+        dps = np.divide(damage, self.cooldown[safe], out=np.full(damage.shape, np.nan), where=valid & (self.cooldown[safe] > 0))
+        dps[valid & (self.cooldown[safe] <= 0)] = 0
+        return damage, dps
+
+
+# ===== FORMA COMPILADA =====
+class GameData:
+    def __init__(self, raw, digest=None):
+        validate(raw)
+        self.version = raw["version"]
+        self.hash = digest
+        self.techniques_db = _freeze(raw["techniques"])
+        self.weapons_db = _freeze(raw["weapons"])
+        self.charm_bonuses = _freeze(raw["charm_bonuses"])
+        self.faction_bonuses = _freeze(raw["faction_bonuses"])
+        self.charms = (NO_CHARM,) + tuple(self.charm_bonuses)
+        self.elements = tuple(e for e in self.techniques_db if e != COMMON_ELEMENT)
+        self.techniques = TechniqueTable(self.techniques_db)
+
+        # Guild, charm e facção compilados uma vez em matrizes (fonte, atributo); ver modifiers
+        self.charm_codes = MappingProxyType({c: i for i, c in enumerate(self.charms)})
+        self.modifiers = ModifierPipeline([
+            ModifierSource.scaled("guild", "percent", ATTRIBUTES, {attr: GUILD_BONUS_PER_LEVEL for attr in ATTRIBUTES}),
+            ModifierSource("charm", "bonus", ATTRIBUTES, {NO_CHARM: {}, **self.charm_bonuses}),
+            ModifierSource.scaled("faction", "flat", ATTRIBUTES, {attr: 1 for attr in ATTRIBUTES}),
+        ])
+
+        # Armas; a última linha é o sentinela "sem arma"
+        self.weapon_names = tuple(self.weapons_db)
+        self.weapon_codes = MappingProxyType({w: i for i, w in enumerate(self.weapon_names)})
+        self.weapon_base = np.array([w["base_damage"] for w in self.weapons_db.values()] + [np.nan], dtype=np.float64)
+        self.weapon_scaling_idx = np.array([ATTRIBUTES.index(w["scaling"]) for w in self.weapons_db.values()] + [0])
+        self.weapon_req = np.zeros((len(self.weapon_names) + 1, len(ATTRIBUTES)))
+        for i, weapon in enumerate(self.weapons_db.values()):
+            for attr, value in weapon["requirements"].items():
+                self.weapon_req[i, ATTRIBUTES.index(attr)] = value
+        self.weapon_req[-1] = np.inf  # Sem arma: nunca atende
+        self.no_weapon = len(self.weapon_names)
+
+        self.faction_codes = MappingProxyType({f: i for i, f in enumerate(self.faction_bonuses)})
+        self.faction_values = np.array(list(self.faction_bonuses.values()), dtype=np.int64)
+
+        for array in (self.weapon_base,
+                      self.weapon_scaling_idx, self.weapon_req, self.faction_values):
+            array.flags.writeable = False
+
+    def __repr__(self):
+        return f"GameData(version={self.version!r}, hash={(self.hash or '')[:12]!r})"
+
+
+# ===== CARREGAMENTO =====
+_loaded = {}  # versão -> (mtime_ns, tamanho, GameData)
+_errors = {}  # versão -> (mtime_ns, tamanho, mensagem) da última releitura que falhou
+_lock = threading.Lock()
+log = logging.getLogger(__name__)
+
+
+def _version_key(version):
+    # Ordem natural: "1.10" vem depois de "1.9"
+    return [(0, int(part), "") if part.isdigit() else (1, 0, part) for part in re.split(r"(\d+)", version) if part]
+
+
+def available_versions(data_dir=None):
+    data_dir = data_dir or DATA_DIR
+    if not os.path.isdir(data_dir):
+        return []
+    versions = [name[:-len(".json")] for name in os.listdir(data_dir) if name.endswith(".json")]
+    return sorted(versions, key=_version_key)
+
+
+def default_version():
+    if DATA_VERSION:
+        return DATA_VERSION
+    versions = available_versions()
+    if not versions:
+        raise GameDataError(f"Nenhum arquivo de dados em {DATA_DIR}")
+    return versions[-1]
+
+
+def load_game_data(version=None):
+    # Uma GameData por versão e por processo. Cada chamada custa um stat(); o arquivo só é
+    # relido se mtime/tamanho mudarem, e só é recompilado se o conteúdo (sha256) mudar.
+    version = version or default_version()
+    # Só nomes de arquivos que existem em DATA_DIR: a versão pode vir de fora (?version= da API),
+    # e "../x" ou um caminho absoluto leriam qualquer .json do disco. Versões já carregadas
+    # passaram por esta checagem, então o caminho comum não lista o diretório
+    if version not in _loaded and version not in available_versions():
+        raise GameDataError(f"Versão de dados desconhecida: {version}")
+    path = os.path.join(DATA_DIR, f"{version}.json")
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        if version in _loaded:
+            return _keep_last_good(version, None, f"{path}: arquivo removido")
+        raise GameDataError(f"Versão de dados desconhecida: {version}") from None
+    stamp = (stat.st_mtime_ns, stat.st_size)
+
+    cached = _loaded.get(version)
+    if cached is not None and cached[:2] == stamp:
+        return cached[2]
+    failed = _errors.get(version)
+    if cached is not None and failed is not None and failed[:2] == stamp:
+        return cached[2]  # Mesma edição quebrada já registrada: não relê
+
+    with _lock:
+        cached = _loaded.get(version)
+        if cached is not None and cached[:2] == stamp:
+            return cached[2]
+        try:
+            data = _read(path, version, cached)
+        except GameDataError as e:
+            if cached is None:
+                raise
+            return _keep_last_good(version, stamp, str(e))
+        _loaded[version] = stamp + (data,)
+        _errors.pop(version, None)
+        return data
+
+
+def _read(path, version, cached):
+    with open(path, "rb") as f:
+        payload = f.read()
+    digest = hashlib.sha256(payload).hexdigest()
+    if cached is not None and cached[2].hash == digest:
+        return cached[2]  # Só o mtime mudou: mantém a forma compilada
+    try:
+        raw = json.loads(payload)
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+        raise GameDataError(f"{path}: JSON inválido ({e})") from None
+    data = GameData(raw, digest)
+    if data.version != version:
+        raise GameDataError(f"{path}: versão declarada {data.version!r} difere do nome do arquivo")
+    return data
+
+
+def _keep_last_good(version, stamp, message):
+    # Uma edição quebrada do arquivo não derruba quem já usa esta versão: segue servindo a última
+    # GameData válida e registra o erro (load_error) até o arquivo voltar a carregar
+    if _errors.get(version, (None, None, None))[2] != message:
+        log.warning("Falha ao recarregar dados %s; mantendo a última versão válida: %s", version, message)
+    _errors[version] = (stamp or (None, None)) + (message,)
+    return _loaded[version][2]
+
+
+def load_error(version):
+    # Mensagem da última releitura que falhou para esta versão, ou None
+    failed = _errors.get(version)
+    return failed[2] if failed else None
+
+
+def resolve(data=None):
+    # Aceita GameData, nome de versão ou None (versão padrão)
+    return data if isinstance(data, GameData) else load_game_data(data)
+
+
+def loaded_versions():
+    return sorted(_loaded, key=_version_key)
+
+
+def clear():
+    with _lock:
+        _loaded.clear()
+        _errors.clear()
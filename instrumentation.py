@@ -0,0 +1,246 @@
+import cProfile
+import http.server
+import io
+import json
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+
+# ===== CONFIGURAÇÃO =====
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+WINDOW = 512  # amostras por span mantidas para os percentis
+QUANTILES = (0.5, 0.95, 0.99)
+METRICS_FILE = os.environ.get("NINOFF_METRICS_FILE", os.path.join(BASE_DIR, ".cache", "metrics.prom"))
+METRICS_PORT = os.environ.get("NINOFF_METRICS_PORT")  # ex.: 9464 expõe /metrics e /metrics.json
+DEBUG_ENV = "NINOFF_DEBUG"
+PROFILE_TOP = 30
+CAPTURE_MAX_AGE = 120  # segundos; captura ativa há mais tempo que isso ficou órfã
+PROMETHEUS_PREFIX = "ninoff"
+CAPTURE_KINDS = {
+    "cprofile": "cProfile (tempo por função)",
+    "tracemalloc": "tracemalloc (alocações por linha)",
+}
+
+
+# ===== MÉTRICAS =====
+class SpanStats:
+    def __init__(self, window=WINDOW):
+        self.samples = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, seconds):
+        self.samples.append(seconds)
+        self.count += 1
+        self.total += seconds
+
+    def summary(self):
+        samples = np.fromiter(self.samples, dtype=np.float64, count=len(self.samples))
+        values = np.quantile(samples, QUANTILES) if len(samples) else np.zeros(len(QUANTILES))
+        summary = {f"p{int(q * 100)}": float(v) for q, v in zip(QUANTILES, values)}
+        summary.update({
+            "last": float(samples[-1]) if len(samples) else 0.0,
+            "count": self.count,
+            "sum": self.total,
+        })
+        return summary
+
+
+class Metrics:
+    def __init__(self, window=WINDOW):
+        self.window = window
+        self._spans = {}
+        self._lock = threading.Lock()
+
+    def record(self, name, seconds):
+        with self._lock:
+            stats = self._spans.get(name)
+            if stats is None:
+                stats = self._spans[name] = SpanStats(self.window)
+            stats.add(seconds)
+
+    @contextmanager
+    def span(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def rerun(self, prefix="rerun"):
+        return RerunTimer(self, prefix)
+
+    def snapshot(self):
+        # Percentis em segundos por span, na ordem em que os spans apareceram
+        with self._lock:
+            return {name: stats.summary() for name, stats in self._spans.items()}
+
+    def clear(self):
+        with self._lock:
+            self._spans.clear()
+
+    # ===== EXPORTAÇÃO =====
+    def to_json(self):
+        return json.dumps({"generated_at": time.time(), "unit": "seconds", "spans": self.snapshot()}, indent=2)
+
+    def to_prometheus(self):
+        # Formato texto do Prometheus: um summary com quantis por span
+        name = f"{PROMETHEUS_PREFIX}_span_seconds"
+        lines = [f"# HELP {name} Duração das seções do Metanin.py por rerun",
+                 f"# TYPE {name} summary"]
+        for span, summary in self.snapshot().items():
+            label = span.replace("\\", "\\\\").replace('"', '\\"')
+            for q in QUANTILES:
+                lines.append(f'{name}{{span="{label}",quantile="{q}"}} {summary[f"p{int(q * 100)}"]:.9f}')
+            lines.append(f'{name}_sum{{span="{label}"}} {summary["sum"]:.9f}')
+            lines.append(f'{name}_count{{span="{label}"}} {summary["count"]}')
+        return "\n".join(lines) + "\n"
+
+    def export(self, path=METRICS_FILE):
+        # .json grava JSON; qualquer outra extensão grava o formato do Prometheus
+        content = self.to_json() if path.endswith(".json") else self.to_prometheus()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(tmp_path, path)  # Coletores nunca leem um arquivo pela metade
+        return path
+
+
+class RerunTimer:
+    # Marcações sequenciais: cada mark() fecha a seção iniciada na marcação anterior
+    def __init__(self, metrics, prefix):
+        self.metrics = metrics
+        self.prefix = prefix
+        self.start = self.last = time.perf_counter()
+
+    def mark(self, section):
+        now = time.perf_counter()
+        self.metrics.record(f"{self.prefix}.{section}", now - self.last)
+        self.last = now
+
+    def finish(self):
+        now = time.perf_counter()
+        self.metrics.record(f"{self.prefix}.total", now - self.start)
+        self.last = now
+
+
+# ===== ENDPOINT =====
+class _MetricsHandler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == "/metrics":
+            body, content_type = metrics.to_prometheus(), "text/plain; version=0.0.4; charset=utf-8"
+        elif self.path == "/metrics.json":
+            body, content_type = metrics.to_json(), "application/json"
+        else:
+            self.send_error(404)
+            return
+        payload = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def serve_metrics(port=METRICS_PORT, host="127.0.0.1"):
+    # Sobe o endpoint uma vez por processo (os reruns do Streamlit chamam de novo sem efeito)
+    global _server
+    if not port:
+        return None
+    with _server_lock:
+        if _server is None:
+            _server = http.server.ThreadingHTTPServer((host, int(port)), _MetricsHandler)
+            threading.Thread(target=_server.serve_forever, daemon=True).start()
+    return _server
+
+
+# ===== CAPTURA DE PERFIL =====
+_captures = set()  # capturas ativas no processo
+_captures_lock = threading.Lock()
+
+
+class Capture:
+    def __init__(self, kind):
+        if kind not in CAPTURE_KINDS:
+            raise ValueError(f"Captura desconhecida: {kind}")
+        self.kind = kind
+        self.started_at = None
+        self._profiler = None
+        self._started_tracemalloc = False
+
+    def start(self):
+        if self.kind == "cprofile":
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        else:
+            self._started_tracemalloc = not tracemalloc.is_tracing()
+            if self._started_tracemalloc:
+                tracemalloc.start()
+            tracemalloc.clear_traces()
+        self.started_at = time.time()
+        with _captures_lock:
+            _captures.add(self)
+        return self
+
+    def cancel(self):
+        # Desliga sem relatório; sem efeito se a captura já terminou
+        with _captures_lock:
+            if self not in _captures:
+                return False
+            _captures.discard(self)
+        if self.kind == "cprofile":
+            self._profiler.disable()
+        elif self._started_tracemalloc:
+            tracemalloc.stop()
+        return True
+
+    def stop(self, top=PROFILE_TOP):
+        # Retorna o relatório em texto
+        with _captures_lock:
+            _captures.discard(self)
+        if self.kind == "cprofile":
+            self._profiler.disable()
+            out = io.StringIO()
+            pstats.Stats(self._profiler, stream=out).sort_stats("cumulative").print_stats(top)
+            return out.getvalue()
+
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+        lines = [f"Memória rastreada: atual {current / 1024:.1f} KiB, pico {peak / 1024:.1f} KiB", ""]
+        lines += [str(stat) for stat in snapshot.statistics("lineno")[:top]]
+        return "\n".join(lines)
+
+
+def stop_stale_captures(max_age=CAPTURE_MAX_AGE):
+    # Rede de segurança para sessões que não voltam a rodar: desliga capturas esquecidas ligadas
+    now = time.time()
+    with _captures_lock:
+        stale = [capture for capture in _captures if now - capture.started_at > max_age]
+    return sum(capture.cancel() for capture in stale)
+
+
+def debug_enabled(query_params=None):
+    # Painel opt-in: ?debug=1 na URL ou NINOFF_DEBUG=1 no ambiente
+    if os.environ.get(DEBUG_ENV, "").lower() in ("1", "true", "yes"):
+        return True
+    return bool(query_params) and str(query_params.get("debug", "")).lower() in ("1", "true", "yes")
+
+
+# Instância compartilhada pelo processo
+metrics = Metrics()
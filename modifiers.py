@@ -0,0 +1,127 @@
+import numpy as np
+
+# ===== ORDEM DE EMPILHAMENTO =====
+# Cada estágio aplica valor * (1 + soma dos multiplicadores) + soma dos aditivos, nessa ordem.
+# Dentro de um estágio os multiplicadores se somam (não se compõem); entre estágios, se compõem.
+#   percent: porcentagens sobre o atributo base (guild, buffs %), sem truncar
+#   bonus:   bônus de charm e equipamentos, truncados com int() ao fim do estágio
+#   flat:    pontos inteiros somados depois do truncamento (facção)
+STAGES = ("percent", "bonus", "flat")
+TRUNCATE = {"percent": False, "bonus": True, "flat": True}
+
+
+# ===== FONTES =====
+class ModifierSource:
+    # Uma fonte de bônus compilada uma única vez em matrizes (opção, atributo); attributes dá a
+    # ordem das colunas (ATTRIBUTES em game_data). options: {nome: {atributo: valor}} com
+    # float = multiplicador e int = aditivo (formato do JSON de charms); a primeira opção deve ser
+    # neutra, pois é a usada quando a fonte não é selecionada.
+    # Com rate=True a fonte tem uma única linha que é escalada por uma quantidade (nível de guild,
+    # pontos de facção) em vez de escolhida por código.
+    def __init__(self, name, stage, attributes, options, rate=False):
+        if stage not in STAGES:
+            raise ValueError(f"Estágio desconhecido: {stage}")
+        self.name = name
+        self.stage = stage
+        self.rate = rate
+        self.attributes = tuple(attributes)
+        self.options = tuple(options)
+        self.codes = {option: i for i, option in enumerate(self.options)}
+        self.add = np.zeros((len(self.options), len(self.attributes)))
+        self.mul = np.zeros((len(self.options), len(self.attributes)))
+        for i, bonuses in enumerate(options.values()):
+            for attr, value in bonuses.items():
+                target = self.mul if isinstance(value, float) else self.add
+                target[i, self.attributes.index(attr)] = value
+        if rate and len(self.options) != 1:
+            raise ValueError(f"Fonte {name}: rate=True exige exatamente uma opção")
+        self.add.flags.writeable = False
+        self.mul.flags.writeable = False
+        # Listas do Python para o caminho escalar (apply_one), sem custo de numpy por chamada
+        self._add_rows = self.add.tolist()
+        self._mul_rows = self.mul.tolist()
+
+    @classmethod
+    def scaled(cls, name, stage, attributes, per_unit):
+        # per_unit: {atributo: valor por unidade}; float = multiplicador, int = aditivo
+        return cls(name, stage, attributes, {name: per_unit}, rate=True)
+
+    def contribution(self, selection, n):
+        # Matrizes (n, atributos) de aditivos e multiplicadores para a seleção (códigos ou quantidades)
+        if self.rate:
+            amount = np.broadcast_to(np.asarray(selection, dtype=np.float64), (n,))[:, None]
+            return amount * self.add[0], amount * self.mul[0]
+        codes = np.broadcast_to(np.asarray(selection, dtype=np.int64), (n,))
+        return self.add[codes], self.mul[codes]
+
+    def contribution_one(self, selection, j):
+        if self.rate:
+            return selection * self._add_rows[0][j], selection * self._mul_rows[0][j]
+        code = self.codes.get(selection) if isinstance(selection, str) else selection
+        if code is None:
+            raise ValueError(f"Opção desconhecida para {self.name}: {selection}")
+        return self._add_rows[code][j], self._mul_rows[code][j]
+
+    def __repr__(self):
+        return f"ModifierSource({self.name!r}, {self.stage!r}, {len(self.options)} opções)"
+
+
+# ===== PIPELINE =====
+class ModifierPipeline:
+    def __init__(self, sources):
+        self.sources = tuple(sources)
+        names = [source.name for source in self.sources]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Fontes repetidas: {names}")
+        if len({source.attributes for source in self.sources}) > 1:
+            raise ValueError("Fontes com atributos em ordens diferentes")
+        self.attributes = self.sources[0].attributes if self.sources else ()
+        self.by_name = {source.name: source for source in self.sources}
+        self.stages = [(stage, [s for s in self.sources if s.stage == stage]) for stage in STAGES]
+        self.stages = [(stage, sources) for stage, sources in self.stages if sources]
+        # Caminho escalar: (trunca?, fontes) por estágio e índice por atributo, resolvidos uma vez
+        self._index = {attr: j for j, attr in enumerate(self.attributes)}
+        self._scalar_stages = [(TRUNCATE[stage], tuple(sources)) for stage, sources in self.stages]
+
+    def extended(self, *sources):
+        # Novo pipeline com fontes extras (equipamentos, buffs); o original não muda
+        return ModifierPipeline(self.sources + sources)
+
+    def apply(self, base, selections):
+        # base (n, atributos); selections: {fonte: códigos ou quantidades (escalar ou (n,))}.
+        # Fontes ausentes de selections ficam neutras (código 0 / quantidade 0)
+        base = np.asarray(base)
+        value = base.astype(np.float64).reshape(-1, len(self.attributes))
+        n = len(value)
+        for stage, sources in self.stages:
+            add = np.zeros_like(value)
+            mul = np.zeros_like(value)
+            for source in sources:
+                if source.name in selections:
+                    source_add, source_mul = source.contribution(selections[source.name], n)
+                    add += source_add
+                    mul += source_mul
+            value = value * (1 + mul) + add
+            if TRUNCATE[stage]:
+                value = np.trunc(value)
+        return value.astype(np.int64).reshape(base.shape)
+
+    def apply_one(self, base, attr, selections):
+        # Mesmo cálculo de apply() para um único atributo, em floats do Python
+        j = self._index[attr]
+        value = float(base)
+        for truncate, sources in self._scalar_stages:
+            add = mul = 0.0
+            for source in sources:
+                selection = selections.get(source.name)
+                if selection is not None:
+                    source_add, source_mul = source.contribution_one(selection, j)
+                    add += source_add
+                    mul += source_mul
+            value = value * (1 + mul) + add
+            if truncate:
+                value = float(int(value))
+        return int(value)
+
+    def __repr__(self):
+        return f"ModifierPipeline({', '.join(s.name for s in self.sources)})"
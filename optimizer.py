@@ -0,0 +1,123 @@
+import numpy as np
+
+from engine import ATTRIBUTES, BASE_MIN, MAX_POINTS, WEAPON_SCALING_FACTOR, final_attributes_array, resolve
+
+# ===== CONSTANTES =====
+OBJECTIVES = {
+    "dps": "DPS Total",
+    "tech": "Melhor Técnica",
+    "weapon": "Dano da Arma",
+}
+CHUNK_ROWS = 250_000
+
+
+# ===== ENUMERAÇÃO =====
+def compositions(total, parts):
+    # Todas as distribuições de `total` pontos em `parts` atributos (cada linha soma `total`)
+    if parts == 1:
+        return np.array([[total]], dtype=np.int32)
+    if parts == 2:
+        first = np.arange(total + 1, dtype=np.int32)
+        return np.column_stack([first, total - first])
+    blocks = []
+    for first in range(total + 1):
+        rest = compositions(total - first, parts - 1)
+        head = np.full((len(rest), 1), first, dtype=np.int32)
+        blocks.append(np.hstack([head, rest]))
+    return np.vstack(blocks)
+
+
+def bonus_table(charm, guild_level, faction_bonus, max_base, data=None):
+    # Atributo final para cada valor base possível (linha = atributo, coluna = base)
+    data = resolve(data)
+    table = np.zeros((len(ATTRIBUTES), max_base + 1), dtype=np.int64)
+    bases = np.repeat(np.arange(BASE_MIN, max_base + 1)[:, None], len(ATTRIBUTES), axis=1)
+    table[:, BASE_MIN:] = final_attributes_array(bases, data.charm_codes[charm], guild_level, faction_bonus, data).T
+    return table
+
+
+def min_base_for(table_row, required):
+    # Menor base cujo valor final atende ao requisito (None se impossível)
+    hits = np.nonzero(table_row[BASE_MIN:] >= required)[0]
+    return int(hits[0]) + BASE_MIN if len(hits) else None
+
+
+# ===== PONTUAÇÃO =====
+def score_builds(finals, objective, tech_indices, weapon_data, data=None):
+    if objective == "weapon":
+        return weapon_data["base_damage"] + finals[:, ATTRIBUTES.index(weapon_data["scaling"])] * WEAPON_SCALING_FACTOR
+
+    techniques = resolve(data).techniques
+    damage = techniques.damage(finals, tech_indices)
+    if objective == "tech":
+        return damage.max(axis=1)
+    return techniques.dps(damage, tech_indices).sum(axis=1)
+
+
+# ===== OTIMIZADOR =====
+def optimize_builds(primary, secondary, charm, guild_level, faction_bonus,
+                    objective="dps", weapon=None, require_weapon=False,
+                    include_common=False, points=None, top_n=10, max_points=MAX_POINTS, data=None):
+    if objective not in OBJECTIVES:
+        raise ValueError(f"Objetivo desconhecido: {objective}")
+    if objective == "weapon" and weapon is None:
+        raise ValueError("O objetivo 'weapon' exige uma arma selecionada")
+
+    data = resolve(data)
+    points = max_points if points is None else min(points, max_points)
+    max_base = BASE_MIN + max_points
+    table = bonus_table(charm, guild_level, faction_bonus, max_base, data)
+
+    elements = [primary, secondary] + (["Common"] if include_common else [])
+    tech_indices = data.techniques.indices(*elements)
+    weapon_data = data.weapons_db[weapon] if weapon else None
+
+    # Só atributos que pontuam recebem pontos livres; os demais ficam no mínimo
+    if objective == "weapon":
+        free = [ATTRIBUTES.index(weapon_data["scaling"])]
+    else:
+        free = sorted({int(i) for i in data.techniques.scaling_idx[tech_indices] if i >= 0})
+    if not free:
+        return []
+
+    # Requisitos da arma viram limites inferiores de base
+    lower = np.full(len(ATTRIBUTES), BASE_MIN, dtype=np.int64)
+    if require_weapon and weapon_data:
+        for attr, required in weapon_data["requirements"].items():
+            i = ATTRIBUTES.index(attr)
+            needed = min_base_for(table[i], required)
+            if needed is None:
+                return []
+            lower[i] = max(lower[i], needed)
+
+    budget = points - int((lower - BASE_MIN).sum())
+    if budget < 0:
+        return []
+
+    # O dano é monótono nos atributos: gastar todo o orçamento nunca piora a build
+    combos = compositions(budget, len(free))
+    best_scores, best_bases = [], []
+    for start in range(0, len(combos), CHUNK_ROWS):
+        chunk = combos[start:start + CHUNK_ROWS]
+        bases = np.tile(lower, (len(chunk), 1))
+        bases[:, free] += chunk
+        finals = table[np.arange(len(ATTRIBUTES)), bases]
+        scores = score_builds(finals, objective, tech_indices, weapon_data, data)
+        keep = min(top_n, len(scores))
+        top = np.argpartition(-scores, keep - 1)[:keep]
+        best_scores.append(scores[top])
+        best_bases.append(bases[top])
+
+    scores = np.concatenate(best_scores)
+    bases = np.vstack(best_bases)
+    order = np.argsort(-scores, kind="stable")[:top_n]
+
+    results = []
+    for i in order:
+        finals = table[np.arange(len(ATTRIBUTES)), bases[i]]
+        row = {attr: int(bases[i, j]) for j, attr in enumerate(ATTRIBUTES)}
+        row.update({f"{attr} Final": int(finals[j]) for j, attr in enumerate(ATTRIBUTES)})
+        row["Pontos Gastos"] = int(bases[i].sum()) - BASE_MIN * len(ATTRIBUTES)
+        row[OBJECTIVES[objective]] = float(scores[i])
+        results.append(row)
+    return results
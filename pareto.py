@@ -0,0 +1,174 @@
+from collections import OrderedDict
+from functools import lru_cache
+from itertools import product
+
+import numpy as np
+
+from engine import ATTRIBUTES, BASE_MIN, MAX_POINTS, eligible_weapons, final_attributes_array, resolve
+from optimizer import compositions
+
+# ===== CONSTANTES =====
+OBJECTIVES = {
+    "burst": "Burst (maior dano)",
+    "dps": "DPS Total",
+    "efficiency": "Dano por Chakra",
+    "weapons": "Armas Liberadas",
+}
+GUILD_LEVELS = list(range(0, 11))
+BLOCK_ROWS = 256
+CANDIDATE_CHUNK = 16384
+FRONT_CHUNK = 256
+SLICE_CACHE_SIZE = 2048
+
+
+# ===== SKYLINE =====
+def _dominated_by(front, candidates, strict=True):
+    # True para cada linha de `candidates` dominada por alguma linha de `front`. Com strict=False,
+    # cópias exatas da fronteira também contam (já estão representadas nela).
+    # Compara coluna a coluna em blocos, evitando o array 3D e a redução no eixo dos objetivos.
+    dominated = np.zeros(len(candidates), dtype=bool)
+    columns = np.ascontiguousarray(candidates.T)
+    for c in range(0, len(candidates), CANDIDATE_CHUNK):
+        chunk = columns[:, c:c + CANDIDATE_CHUNK]
+        for f in range(0, len(front), FRONT_CHUNK):
+            pivots = front[f:f + FRONT_CHUNK]
+            hits = pivots[:, 0, None] >= chunk[0]
+            for j in range(1, len(columns)):
+                hits &= pivots[:, j, None] >= chunk[j]
+            if strict:
+                equal = pivots[:, 0, None] == chunk[0]
+                for j in range(1, len(columns)):
+                    equal &= pivots[:, j, None] == chunk[j]
+                hits &= ~equal
+            dominated[c:c + CANDIDATE_CHUNK] |= hits.any(axis=0)
+    return dominated
+
+
+def pareto_front(points):
+    # Índices das linhas não dominadas (todos os objetivos são maximizados).
+    # Vetores repetidos entram uma única vez, pela primeira ocorrência.
+    points = np.asarray(points, dtype=np.float64)
+    if len(points) == 0:
+        return np.empty(0, dtype=np.int64)
+
+    if points.shape[1] == 2:
+        # Varredura: ordena por x decrescente e mantém quem supera o melhor y já visto
+        order = np.lexsort((-points[:, 1], -points[:, 0]))
+        y = points[order, 1]
+        best_before = np.concatenate([[-np.inf], np.maximum.accumulate(y)[:-1]])
+        front = order[y > best_before]
+    else:
+        # Sort-filter-skyline: quem domina tem soma maior e vem antes na ordem. A cada rodada o
+        # topo dos sobreviventes vira fronteira e elimina de uma vez todos os que ele domina.
+        alive = np.argsort(-points.sum(axis=1), kind="stable")
+        front_rows = []
+        while len(alive):
+            head, alive = alive[:BLOCK_ROWS], alive[BLOCK_ROWS:]
+            block = points[head]
+            head = head[~_dominated_by(block, block)]
+            front_rows.append(head)
+            if len(alive):
+                alive = alive[~_dominated_by(points[head], points[alive], strict=False)]
+        front = np.concatenate(front_rows)
+
+    front = np.sort(front)
+    _, first = np.unique(points[front], axis=0, return_index=True)
+    return np.sort(front[first])
+
+
+# ===== ESPAÇO DE BUILDS =====
+@lru_cache(maxsize=16)
+def allocations(free, step, points=MAX_POINTS):
+    # Distribuições de `points` entre os atributos livres em passos de `step` (resto vai para o primeiro)
+    bases = np.full((0, len(ATTRIBUTES)), BASE_MIN, dtype=np.int64)
+    if free:
+        combos = compositions(points // step, len(free)).astype(np.int64) * step
+        combos[:, 0] += points % step
+        bases = np.full((len(combos), len(ATTRIBUTES)), BASE_MIN, dtype=np.int64)
+        bases[:, list(free)] += combos
+    bases.flags.writeable = False
+    return bases
+
+
+def free_attributes(primary, secondary, data=None):
+    data = resolve(data)
+    indices = data.techniques.indices(primary, secondary)
+    free = {int(i) for i in data.techniques.scaling_idx[indices] if i >= 0}
+    for weapon in data.weapons_db.values():
+        free.update(ATTRIBUTES.index(attr) for attr in weapon["requirements"])
+        free.add(ATTRIBUTES.index(weapon["scaling"]))
+    return tuple(sorted(free))
+
+
+def objective_matrix(finals, indices, data=None):
+    data = resolve(data)
+    damage = data.techniques.damage(finals, indices)
+    total_cost = data.techniques.cost[indices].sum()
+    return np.column_stack([
+        damage.max(axis=1),
+        data.techniques.dps(damage, indices).sum(axis=1),
+        damage.sum(axis=1) / total_cost if total_cost else np.zeros(len(finals)),
+        eligible_weapons(finals, data).sum(axis=1),
+    ])
+
+
+# ===== EXPLORADOR INCREMENTAL =====
+class ParetoExplorer:
+    def __init__(self, cache_size=SLICE_CACHE_SIZE):
+        self.cache_size = cache_size
+        self._slices = OrderedDict()
+
+    def _slice(self, data, primary, secondary, step, charm, faction, guild_level):
+        # Uma fatia = (charm, facção, guild) para um par de elementos; guarda só sua fronteira local.
+        # O hash dos dados entra na chave: versões diferentes (ou um arquivo recarregado) não se misturam
+        key = (data.hash, primary, secondary, step, charm, faction, guild_level)
+        cached = self._slices.get(key)
+        if cached is not None:
+            self._slices.move_to_end(key)
+            return cached
+
+        bases = allocations(free_attributes(primary, secondary, data), step)
+        finals = final_attributes_array(bases, data.charm_codes[charm], guild_level, data.faction_bonuses[faction], data)
+        objectives = objective_matrix(finals, data.techniques.indices(primary, secondary), data)
+        front = pareto_front(objectives)
+        cached = (bases[front], objectives[front])
+
+        self._slices[key] = cached
+        if len(self._slices) > self.cache_size:
+            self._slices.popitem(last=False)
+        return cached
+
+    def frontier(self, primary, secondary, charms=None, factions=None,
+                 guild_levels=GUILD_LEVELS, step=5, data=None):
+        # A fronteira global está contida na união das fronteiras das fatias
+        data = resolve(data)
+        charms = data.charms if charms is None else charms
+        factions = tuple(data.faction_bonuses) if factions is None else factions
+        keys, bases, objectives = [], [], []
+        for charm, faction, guild_level in product(charms, factions, guild_levels):
+            slice_bases, slice_objectives = self._slice(data, primary, secondary, step, charm, faction, guild_level)
+            keys.extend([(charm, faction, guild_level)] * len(slice_bases))
+            bases.append(slice_bases)
+            objectives.append(slice_objectives)
+        if not keys:
+            return []
+
+        bases = np.vstack(bases)
+        objectives = np.vstack(objectives)
+        front = pareto_front(objectives)
+
+        rows = []
+        for i in front:
+            charm, faction, guild_level = keys[i]
+            row = {"Charm": charm, "Facção": faction, "Guild": guild_level}
+            row.update({attr: int(bases[i, j]) for j, attr in enumerate(ATTRIBUTES)})
+            row.update({label: float(objectives[i, j]) for j, label in enumerate(OBJECTIVES.values())})
+            rows.append(row)
+        return rows
+
+    def clear(self):
+        self._slices.clear()
+
+
+# Instância compartilhada pelo processo
+explorer = ParetoExplorer()
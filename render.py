@@ -0,0 +1,119 @@
+from functools import lru_cache
+from urllib.parse import quote
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from engine import resolve
+from instrumentation import metrics
+
+# ===== CONSTANTES =====
+EMOJI_MAP = {
+    "Fire": "🔥", "Wind": "🍃", "Lightning": "⚡", "Earth": "🪨",
+    "Water": "💧", "Medical": "🧪", "Weapon": "🗡️", "Taijutsu": "🥋"
+}
+COLORS = {
+    "Fire": "#FF5555", "Wind": "#55FF55", "Lightning": "#FFFF55",
+    "Earth": "#FFAA55", "Water": "#55AAFF", "Medical": "#55FFAA",
+    "Weapon": "#AAAAAA", "Taijutsu": "#AA55FF", "Common": "#DDDDDD"
+}
+DEFAULT_COLOR = "#FFFFFF"
+RENDER_MODES = {
+    "auto": "Automático",
+    "colorido": "🎨 Colorido",
+    "rapido": "⚡ Rápido",
+}
+STYLER_MAX_ROWS = 100  # Acima disso o modo automático dispensa o Styler
+TECH_FORMAT = {"Dano Total": "{:.1f}", "DPS": "{:.1f}"}
+
+
+# ===== FUNÇÕES =====
+def label_with_emoji(name):
+    return f"{EMOJI_MAP.get(name, '')} {name}"
+
+
+def _css(color):
+    return f"background-color: {color}; color: #000000"
+
+
+def _swatch(color):
+    svg = f"<svg xmlns='http://www.w3.org/2000/svg' width='16' height='16'><rect width='16' height='16' rx='3' fill='{color}'/></svg>"
+    return "data:image/svg+xml;utf8," + quote(svg)
+
+
+# Estilos pré-calculados por elemento: cada linha só faz uma busca pelo rótulo
+CSS_BY_LABEL = {label_with_emoji(e): _css(c) for e, c in COLORS.items()}
+SWATCH_BY_LABEL = {label_with_emoji(e): _swatch(c) for e, c in COLORS.items()}
+
+
+def element_labels(techniques):
+    return np.array([label_with_emoji(e) for e in techniques.element_names], dtype=object)
+
+
+def create_tech_df(elements, attributes, max_level=None, data=None):
+    techniques = resolve(data).techniques
+    if max_level is None:
+        indices = techniques.indices(*elements)
+    else:
+        indices = techniques.unlocked(max_level, *elements)
+    damage = techniques.damage(np.asarray(attributes, dtype=np.float64), indices)
+
+    return pd.DataFrame({
+        "Técnica": techniques.names[indices],
+        "Elemento": element_labels(techniques)[techniques.element[indices]],
+        "Dano Base": techniques.base[indices],
+        "Scaling": techniques.scaling[indices],
+        "Dano Total": damage,
+        "DPS": techniques.dps(damage, indices),
+        "Chakra": techniques.cost[indices],
+        "Cooldown": techniques.cooldown[indices],
+        "Nível": techniques.level[indices]
+    })
+
+
+def element_styles(df):
+    # Mesma cor por linha que o antigo style_element, mas calculada de uma vez (Styler.apply com axis=None)
+    css = df["Elemento"].map(CSS_BY_LABEL).fillna(_css(DEFAULT_COLOR)).to_numpy()
+    return pd.DataFrame(np.repeat(css[:, None], df.shape[1], axis=1), index=df.index, columns=df.columns)
+
+
+def resolve_mode(mode, rows, partial=False):
+    # partial: rerun só de fragmentos (mudança de atributo). O Styler custa ~10 ms por tabela para
+    # serializar; no modo automático ele fica para os reruns completos
+    if mode == "auto":
+        return "colorido" if rows <= STYLER_MAX_ROWS and not partial else "rapido"
+    return mode
+
+
+def render_table(df, mode="auto", styles=None, partial=False):
+    column_config = {
+        "Dano Total": st.column_config.NumberColumn(format="%.1f"),
+        "DPS": st.column_config.NumberColumn(format="%.1f")
+    }
+    if resolve_mode(mode, len(df), partial) == "colorido":
+        styles = element_styles(df) if styles is None else styles
+        return df.style.apply(lambda _: styles, axis=None).format(TECH_FORMAT), column_config
+
+    # Sem Styler: a cor do elemento vira uma coluna de imagem (uma string por elemento)
+    data = df.copy()
+    data.insert(0, "Cor", df["Elemento"].map(SWATCH_BY_LABEL).fillna(_swatch(DEFAULT_COLOR)))
+    column_config["Cor"] = st.column_config.ImageColumn("", width="small")
+    return data, column_config
+
+
+@lru_cache(maxsize=256)
+def _cached_table(elements, attributes, max_level, data_hash, data):
+    # data_hash diferencia versões e arquivos recarregados; data só é usado no cálculo
+    df = create_tech_df(elements, attributes, max_level, data)
+    return df, element_styles(df)
+
+
+def technique_table(elements, attributes, mode="auto", max_level=None, data=None, partial=False):
+    # Cache por (elementos, vetor de atributos, nível, dados); o Styler é recriado a cada chamada por ser mutável
+    data = resolve(data)
+    with metrics.span("render.create_tech_df"):
+        df, styles = _cached_table(tuple(elements), tuple(attributes), max_level, data.hash, data)
+    with metrics.span("render.style"):
+        data, column_config = render_table(df, mode, styles, partial)
+    return data, column_config, len(df)
@@ -0,0 +1,144 @@
+from bisect import bisect_right
+from functools import lru_cache
+
+import numpy as np
+
+from engine import ATTRIBUTES, BASE_MIN, MAX_BASE, MAX_POINTS, NO_CHARM, level_for_points, resolve
+from optimizer import bonus_table
+
+# ===== CONSTANTES =====
+IMPOSSIBLE = -1
+
+
+# ===== SOLVER INVERSO =====
+@lru_cache(maxsize=512)
+def _final_by_base(charm, guild_level, faction_bonus, data_hash, data):
+    # Atributo final para cada base (linha = atributo); não decrescente em cada linha, o que
+    # permite inverter apply_bonuses com busca binária. data_hash separa versões dos dados
+    table = bonus_table(charm, guild_level, faction_bonus, MAX_BASE, data)[:, BASE_MIN:]
+    table.flags.writeable = False
+    return table
+
+
+def min_bases(required, charm=NO_CHARM, guild_level=0, faction_bonus=0, data=None):
+    # required: (..., atributos) com o valor final exigido (0 = sem exigência).
+    # Retorna a menor base por atributo que atinge o valor, ou IMPOSSIBLE acima de MAX_BASE
+    data = resolve(data)
+    table = _final_by_base(charm, guild_level, faction_bonus, data.hash, data)
+    required = np.asarray(required)
+    bases = np.empty(required.shape, dtype=np.int64)
+    for j in range(len(ATTRIBUTES)):
+        bases[..., j] = np.searchsorted(table[j], required[..., j], side="left") + BASE_MIN
+    return np.where(bases > MAX_BASE, IMPOSSIBLE, bases)
+
+
+def _base_vector(base):
+    if base is None:
+        return np.full(len(ATTRIBUTES), BASE_MIN, dtype=np.int64)
+    return np.array([base.get(attr, BASE_MIN) for attr in ATTRIBUTES], dtype=np.int64)
+
+
+def solve_requirements(weapon, charm=NO_CHARM, guild_level=0, faction="Nenhuma", base=None, data=None):
+    # Menor distribuição de pontos base que equipa `weapon` depois dos bônus. Partindo de `base`
+    # (atributos base atuais; padrão: todos em BASE_MIN), só sobe o que falta
+    data = resolve(data)
+    if weapon not in data.weapon_codes:
+        raise ValueError(f"Arma desconhecida: {weapon}")
+    current = _base_vector(base)
+    needed = min_bases(data.weapon_req[data.weapon_codes[weapon]], charm, guild_level,
+                       data.faction_bonuses[faction], data)
+    if (needed == IMPOSSIBLE).any():
+        return {"weapon": weapon, "feasible": False, "base": None, "extra_points": None,
+                "points_spent": None, "level": None}
+    solved = np.maximum(current, needed)
+    spent = int(solved.sum()) - BASE_MIN * len(ATTRIBUTES)
+    return {
+        "weapon": weapon,
+        "feasible": spent <= MAX_POINTS,
+        "base": {attr: int(v) for attr, v in zip(ATTRIBUTES, solved)},
+        "extra_points": int((solved - current).sum()),
+        "points_spent": spent,
+        "level": int(level_for_points(spent)),
+    }
+
+
+# ===== ÍNDICE DE REQUISITOS =====
+class RequirementIndex:
+    # Armas agrupadas pelo conjunto de atributos que exigem; em cada grupo, um índice ordenado por
+    # atributo exigido. Uma busca binária por atributo dá o prefixo de armas que o valor atende, e
+    # só o prefixo do atributo mais seletivo é filtrado pelos postos nos demais (grupos de um
+    # atributo só viram uma fatia). Armas sem requisito ficam num grupo sempre liberado
+    def __init__(self, data=None):
+        self.data = data = resolve(data)
+        requirements = data.weapon_req[:-1]  # sem o sentinela "sem arma"
+        self.names = np.array(data.weapon_names, dtype=object)
+        required = requirements > 0
+        self.free = np.nonzero(~required.any(axis=1))[0]
+        self.groups = []
+        for signature in np.unique(required[required.any(axis=1)], axis=0):
+            members = np.nonzero((required == signature).all(axis=1))[0]
+            attrs = np.nonzero(signature)[0]
+            reqs = requirements[np.ix_(members, attrs)]
+            order = np.argsort(reqs, axis=0, kind="stable").T  # (atributos do grupo, armas do grupo)
+            values = np.take_along_axis(reqs.T, order, axis=1)
+            rank = np.empty_like(order)
+            for k in range(len(attrs)):
+                rank[k, order[k]] = np.arange(len(members))
+            # Listas do Python para o bisect: uma busca por consulta sem o custo de chamar o numpy
+            self.groups.append((attrs.tolist(), members, order, values.tolist(), rank))
+
+    def __len__(self):
+        return len(self.names)
+
+    def eligible_ids(self, attributes):
+        if isinstance(attributes, dict):
+            vector = [attributes[attr] for attr in ATTRIBUTES]
+        else:
+            vector = np.asarray(attributes).tolist()
+        found = [self.free]
+        for attrs, members, order, values, rank in self.groups:
+            prefix = [bisect_right(values[k], vector[j]) for k, j in enumerate(attrs)]
+            pivot = min(range(len(prefix)), key=prefix.__getitem__)
+            if not prefix[pivot]:
+                continue
+            candidates = order[pivot, :prefix[pivot]]
+            if len(attrs) > 1:
+                candidates = candidates[(rank[:, candidates] < np.array(prefix)[:, None]).all(axis=0)]
+            found.append(members[candidates])
+        return np.sort(np.concatenate(found))
+
+    def eligible(self, attributes):
+        # Armas que os atributos finais (dict ou vetor) equipam, na ordem do arquivo de dados
+        return tuple(self.names[self.eligible_ids(attributes)])
+
+    def count(self, attributes):
+        return len(self.eligible_ids(attributes))
+
+    def cheapest_unlocks(self, base=None, charm=NO_CHARM, guild_level=0, faction="Nenhuma", top=5):
+        # Armas ainda não liberadas, da mais barata para a mais cara em pontos base extras
+        data = self.data
+        current = _base_vector(base)
+        needed = min_bases(data.weapon_req[:-1], charm, guild_level, data.faction_bonuses[faction], data)
+        feasible = (needed != IMPOSSIBLE).all(axis=1)
+        solved = np.maximum(current, needed)
+        extra = (solved - current).sum(axis=1)
+        spent = solved.sum(axis=1) - BASE_MIN * len(ATTRIBUTES)
+        candidates = np.nonzero(feasible & (extra > 0) & (spent <= MAX_POINTS))[0]
+        candidates = candidates[np.argsort(extra[candidates], kind="stable")][:top]
+        return [{
+            "weapon": self.names[i],
+            "extra_points": int(extra[i]),
+            "level": int(level_for_points(spent[i])),
+            "base": {attr: int(v) for attr, v in zip(ATTRIBUTES, solved[i])},
+        } for i in candidates]
+
+
+@lru_cache(maxsize=16)
+def _cached_index(data_hash, data):
+    return RequirementIndex(data)
+
+
+def requirement_index(data=None):
+    # Um índice por versão dos dados (o hash separa arquivos recarregados)
+    data = resolve(data)
+    return _cached_index(data.hash, data)
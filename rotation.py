@@ -0,0 +1,150 @@
+import heapq
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from engine import attribute_vector, requirement_checks, resolve, weapon_damage
+
+# ===== PARÂMETROS DO MODELO =====
+GCD = 1.0  # segundos entre duas ações (técnica ou ataque da arma)
+FIGHT_DURATION = 600  # segundos
+CHAKRA_BASE = 50
+CHAKRA_PER_CHK = 2  # pool = CHAKRA_BASE + CHK * CHAKRA_PER_CHK
+CHARGE_TECHNIQUE = "Charging Chakra"
+CHARGE_RESTORE = 0.25  # fração do pool recuperada por Charging Chakra
+CHUNK_SIZE = 256
+
+
+# ===== LOADOUT =====
+def chakra_pool(attributes):
+    return CHAKRA_BASE + attributes["CHK"] * CHAKRA_PER_CHK
+
+
+def loadout_indices(primary, secondary, include_common=True, level=None, data=None):
+    techniques = resolve(data).techniques
+    elements = [primary, secondary] + (["Common"] if include_common else [])
+    indices = techniques.indices(*elements) if level is None else techniques.unlocked(level, *elements)
+    # Técnicas sem dano não entram na rotação, exceto Charging Chakra
+    keep = (techniques.base[indices] > 0) | (techniques.names[indices] == CHARGE_TECHNIQUE)
+    return indices[keep]
+
+
+# ===== SIMULADOR =====
+def simulate_rotation(attributes, techniques, weapon=None, duration=FIGHT_DURATION, gcd=GCD,
+                      pool=None, charge_restore=CHARGE_RESTORE, data=None):
+    data = resolve(data)
+    table = data.techniques
+    techniques = np.asarray(techniques, dtype=np.int64)
+    pool = chakra_pool(attributes) if pool is None else pool
+    charge = [int(i) for i in techniques if table.names[i] == CHARGE_TECHNIQUE]
+    attacks = np.array([i for i in techniques if table.names[i] != CHARGE_TECHNIQUE], dtype=np.int64)
+
+    # Listas Python: o laço de eventos indexa escalares e é mais rápido sem NumPy
+    damage = table.damage(attribute_vector(attributes), attacks).tolist()
+    cost = table.cost[attacks].tolist()
+    cooldown = table.cooldown[attacks].tolist()
+
+    hit = 0.0
+    if weapon:
+        weapon_data = data.weapons_db[weapon]
+        if all(requirement_checks(weapon_data, attributes).values()):
+            hit = float(weapon_damage(weapon_data, attributes))
+
+    # Cada GCD sem técnica vira um ataque da arma, então o custo de usar um GCD é o hit. Só entram na
+    # rotação técnicas que batem mais que ele; prioridade fixa: maior dano por cast primeiro
+    order = sorted((k for k in range(len(attacks)) if damage[k] > hit), key=lambda k: -damage[k])
+    min_cost = min((cost[k] for k in order), default=math.inf)
+    max_cost = max((cost[k] for k in order), default=0)
+    # Ganho sobre o hit por ponto de chakra, no pior caso (estimativa conservadora para Charging Chakra)
+    gain_per_chakra = min(((damage[k] - hit) / cost[k] for k in order if cost[k] > 0), default=0.0)
+
+    charge_cooldown = float(table.cooldown[charge[0]]) if charge else math.inf
+    charge_ready = 0.0 if charge else math.inf
+    chakra = float(pool)
+    ready = [True] * len(attacks)  # tudo começa pronto
+    cooling = []  # heap de eventos (pronto_em, k)
+    casts = [0] * len(attacks)
+    charges = weapon_hits = 0
+    total = 0.0
+    t = 0.0
+
+    def charge_pays_off():
+        # Charging Chakra troca um hit por chakra; vale se o chakra recuperado (até o que ainda dá
+        # para gastar nos GCDs restantes) paga casts que ganham mais que o hit perdido
+        restored = min(pool - chakra, pool * charge_restore)
+        spendable = max(0, math.ceil((duration - t) / gcd) - 1) * max_cost
+        return min(restored, spendable) * gain_per_chakra > hit
+
+    while t < duration:
+        while cooling and cooling[0][0] <= t:
+            ready[heapq.heappop(cooling)[1]] = True
+
+        # Melhor técnica pronta que cabe no chakra atual
+        chosen = None
+        if chakra >= min_cost:
+            for k in order:
+                if ready[k] and cost[k] <= chakra:
+                    chosen = k
+                    break
+
+        if chosen is not None:
+            chakra -= cost[chosen]
+            total += damage[chosen]
+            casts[chosen] += 1
+            ready[chosen] = False
+            heapq.heappush(cooling, (t + cooldown[chosen], chosen))
+            t += gcd
+            continue
+
+        charge_useful = charge_pays_off()
+        if charge_ready <= t and charge_useful:
+            chakra = min(pool, chakra + pool * charge_restore)
+            charge_ready = t + charge_cooldown
+            charges += 1
+            t += gcd
+            continue
+
+        # Nada para lançar: pula direto ao próximo evento útil, creditando ataques da arma nos GCDs
+        # ociosos. Sem casts o chakra não muda, então charge_useful vale até o próximo evento
+        next_event = min(
+            min((ready_at for ready_at, k in cooling if cost[k] <= chakra), default=math.inf),
+            charge_ready if charge_useful else math.inf,
+            duration,
+        )
+        slots = max(1, math.ceil((next_event - t) / gcd))
+        slots = min(slots, math.ceil((duration - t) / gcd))
+        weapon_hits += slots
+        total += hit * slots
+        t += slots * gcd
+
+    return {
+        "duration": duration,
+        "total_damage": total,
+        "sustained_dps": total / duration if duration > 0 else 0.0,
+        "chakra_pool": pool,
+        "casts": {table.names[attacks[k]]: casts[k] for k in range(len(attacks))},
+        "charges": charges,
+        "weapon_hits": weapon_hits if hit else 0,
+    }
+
+
+# ===== LOTE =====
+def _simulate_chunk(args):
+    loadouts, duration, version = args
+    data = resolve(version)
+    return [simulate_rotation(duration=duration, data=data, **loadout) for loadout in loadouts]
+
+
+def simulate_many(loadouts, duration=FIGHT_DURATION, workers=None, chunk_size=CHUNK_SIZE, data=None):
+    # loadouts: dicts com "attributes", "techniques" e opcionalmente "weapon"
+    # Os workers recebem só o nome da versão e carregam os dados uma vez por processo
+    version = resolve(data).version
+    loadouts = list(loadouts)
+    chunks = [(loadouts[i:i + chunk_size], duration, version) for i in range(0, len(loadouts), chunk_size)]
+    workers = os.cpu_count() if workers == 0 else workers
+    if not workers or workers <= 1 or len(chunks) <= 1:
+        return [result for chunk in chunks for result in _simulate_chunk(chunk)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return [result for chunk in pool.map(_simulate_chunk, chunks) for result in chunk]
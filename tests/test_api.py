@@ -0,0 +1,110 @@
+import asyncio
+import json
+import os
+
+import pytest
+
+import api
+from build_store import normalize_config
+from game_data import DATA_DIR, GameDataError, load_game_data
+
+GOOD = {"primary": "Fire", "secondary": "Wind", "STR": 40}
+
+
+def _post(service, path, body):
+    async def call():
+        try:
+            status, payload, _ = await service.handle("POST", path, json.dumps(body).encode("utf-8"))
+            return status, json.loads(payload)
+        except api.ApiError as e:
+            return e.status, {"error": str(e)}
+    return asyncio.run(call())
+
+
+@pytest.mark.parametrize("change", [
+    {"STR": 10 ** 20}, {"STR": -500}, {"AGI": 291}, {"guild_level": 1e6}, {"guild_level": -1},
+    {"secondary": "Fire"}, {"primary": "Common"},
+    {"INT": 12.99}, {"STR": 40.9}, {"guild_level": 9.9}, {"guild_level": True}, {"STR": False},
+    {"STR": "40.5"}, {"STR": "abc"}, {"STR": None}, {"STR": [40]},
+])
+def test_out_of_range_builds_are_rejected(change):
+    status, payload = _post(api.BuildService(), "/evaluate", {**GOOD, **change})
+    assert status == 400
+    assert "error" in payload
+
+
+@pytest.mark.parametrize("value", [40, 40.0, "40", " 40 "])
+def test_integral_values_are_accepted(value):
+    # Texto com dígitos continua valendo: é o que chega do CSV
+    assert normalize_config({**GOOD, "STR": value, "guild_level": value})["guild_level"] == 40
+    status, payload = _post(api.BuildService(), "/evaluate", {**GOOD, "STR": value})
+    assert status == 200
+    assert payload["attributes"]["STR"] == 40
+
+
+def test_batch_marks_invalid_rows_only():
+    status, payload = _post(api.BuildService(), "/batch", {"builds": [GOOD, {**GOOD, "STR": 10 ** 20}]})
+    assert status == 200
+    assert payload["results"][0]["attributes"]["STR"] == 40
+    assert "error" in payload["results"][1]
+
+
+@pytest.mark.parametrize("relative", [True, False])
+def test_version_outside_data_dir_is_rejected(tmp_path, relative):
+    # Um .json válido fora de data/ não pode ser lido por caminho relativo nem absoluto
+    (tmp_path / "evil.json").write_text(json.dumps({"version": "evil"}), encoding="utf-8")
+    version = str(tmp_path / "evil")
+    if relative:
+        version = os.path.relpath(version, DATA_DIR)
+    status, payload = _post(api.BuildService(), f"/evaluate?version={version}", GOOD)
+    assert status == 400
+    assert payload["error"] == f"Versão de dados desconhecida: {version}"
+    with pytest.raises(GameDataError, match="desconhecida"):
+        load_game_data(version)
+
+
+def test_failed_batch_does_not_fail_other_requests(monkeypatch):
+    # Sem a validação, uma base gigante estoura o int64 do lote; só o pedido dela deve falhar
+    monkeypatch.setattr(api, "validate_config", lambda raw, data=None: normalize_config(raw))
+    service = api.BuildService()
+
+    async def run():
+        return await asyncio.gather(
+            service.handle("POST", "/evaluate", json.dumps({**GOOD, "STR": 10 ** 20}).encode("utf-8")),
+            service.handle("POST", "/evaluate", json.dumps({**GOOD, "STR": 41}).encode("utf-8")),
+            return_exceptions=True)
+
+    bad, good = asyncio.run(run())
+    assert isinstance(bad, OverflowError)
+    assert good[0] == 200 and json.loads(good[1])["attributes"]["STR"] == 41
+
+
+def _raw_request(raw):
+    async def run():
+        server = await asyncio.start_server(lambda r, w: api._serve_connection(api.BuildService(), r, w),
+                                            "127.0.0.1", 0)
+        async with server:
+            reader, writer = await asyncio.open_connection(*server.sockets[0].getsockname()[:2])
+            writer.write(raw)
+            await writer.drain()
+            response = await reader.read()
+            writer.close()
+            return response
+    head, _, body = asyncio.run(run()).partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(body)
+
+
+@pytest.mark.parametrize("length", ["abc", "-5", "1e3", str(api.MAX_BODY + 1), "9" * 5000])
+def test_bad_content_length_is_rejected(length):
+    status, payload = _raw_request(
+        f"POST /evaluate HTTP/1.1\r\nContent-Length: {length}\r\n\r\n".encode("latin-1"))
+    assert status == 400
+    assert "error" in payload
+
+
+def test_valid_content_length_is_served():
+    body = json.dumps(GOOD).encode("utf-8")
+    status, payload = _raw_request(
+        b"POST /evaluate HTTP/1.1\r\nConnection: close\r\nContent-Length: %d\r\n\r\n%s" % (len(body), body))
+    assert status == 200
+    assert payload["attributes"]["STR"] == 40
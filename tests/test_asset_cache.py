@@ -0,0 +1,146 @@
+import http.server
+import socket
+import threading
+import time
+from io import BytesIO
+
+import pytest
+from PIL import Image
+
+from asset_cache import FALLBACK_IMAGE, AssetCache
+
+ETAG = '"v1"'
+
+
+def _png(color):
+    out = BytesIO()
+    Image.new("RGB", (4, 4), color).save(out, format="PNG")
+    return out.getvalue()
+
+
+# ===== SERVIDOR LOCAL =====
+class _Handler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+        server.requests.append(self.headers.get("If-None-Match"))
+        if server.delay:
+            time.sleep(server.delay)
+        if self.headers.get("If-None-Match") == ETAG:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "image/png")
+        self.send_header("Content-Length", str(len(server.body)))
+        self.send_header("ETag", ETAG)
+        self.end_headers()
+        self.wfile.write(server.body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    httpd.daemon_threads = True
+    httpd.requests = []
+    httpd.delay = 0
+    httpd.body = _png("red")
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    httpd.url = f"http://127.0.0.1:{httpd.server_address[1]}/creditos.png"
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _closed_port_url():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    return f"http://127.0.0.1:{port}/creditos.png"
+
+
+def _is_fallback(image):
+    fallback = Image.open(FALLBACK_IMAGE)
+    return image.size == fallback.size and image.tobytes() == fallback.convert(image.mode).tobytes()
+
+
+# ===== CACHE =====
+def test_cold_fetch_then_warm_memory(server, tmp_path):
+    cache = AssetCache(cache_dir=str(tmp_path))
+    image = cache.get_image(server.url)
+    assert image.getpixel((0, 0)) == (255, 0, 0)
+    assert len(server.requests) == 1
+
+    for _ in range(5):
+        assert cache.get_image(server.url) is image
+    assert len(server.requests) == 1
+
+
+def test_warm_disk_skips_network(server, tmp_path):
+    AssetCache(cache_dir=str(tmp_path)).get_bytes(server.url)
+    assert len(server.requests) == 1
+
+    # Novo processo (nova instância): o arquivo em disco ainda está dentro do TTL
+    fresh = AssetCache(cache_dir=str(tmp_path))
+    assert fresh.get_bytes(server.url) == server.body
+    assert len(server.requests) == 1
+
+
+def test_revalidates_with_etag_after_ttl(server, tmp_path):
+    cache = AssetCache(cache_dir=str(tmp_path), ttl=0)
+    first = cache.get_entry(server.url)
+    second = cache.get_entry(server.url)
+
+    assert server.requests == [None, ETAG]
+    assert second is first  # 304: mesma entrada, só renovada
+    assert second.content == server.body
+
+
+def test_fallback_when_unreachable(tmp_path):
+    cache = AssetCache(cache_dir=str(tmp_path), timeout=(0.5, 0.5))
+    assert _is_fallback(cache.get_image(_closed_port_url()))
+
+
+def test_fallback_on_timeout(server, tmp_path):
+    server.delay = 1.5
+    cache = AssetCache(cache_dir=str(tmp_path), timeout=(0.5, 0.5))
+    start = time.perf_counter()
+    assert _is_fallback(cache.get_image(server.url))
+    assert time.perf_counter() - start < 1.5
+    # Dentro do retry_after não tenta a rede de novo
+    cache.get_image(server.url)
+    assert len(server.requests) == 1
+
+
+def test_stale_copy_served_while_refreshing(server, tmp_path):
+    cache = AssetCache(cache_dir=str(tmp_path), ttl=0)
+    stale = cache.get_entry(server.url)
+    server.delay = 1.0
+    worker = threading.Thread(target=cache.get_entry, args=(server.url,))
+    worker.start()
+    while len(server.requests) < 2:
+        time.sleep(0.01)
+
+    # O download lento não segura o lock: outra sessão recebe a cópia atual na hora
+    start = time.perf_counter()
+    assert cache.get_entry(server.url) is stale
+    assert time.perf_counter() - start < 0.2
+    worker.join()
+    assert len(server.requests) == 2
+
+
+def test_undecodable_entry_is_not_decoded_again(server, tmp_path, monkeypatch):
+    server.body = b"not an image"
+    cache = AssetCache(cache_dir=str(tmp_path))
+    assert _is_fallback(cache.get_image(server.url))
+
+    opened = []
+    original_open = Image.open
+    monkeypatch.setattr(Image, "open", lambda fp, *args: opened.append(fp) or original_open(fp, *args))
+    for _ in range(3):
+        assert _is_fallback(cache.get_image(server.url))
+    assert all(isinstance(fp, str) for fp in opened)  # só a imagem local do _is_fallback
+    assert len(server.requests) == 1
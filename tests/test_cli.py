@@ -0,0 +1,76 @@
+import csv
+import io
+import json
+
+import pytest
+
+from cli import read_chunks, run
+
+# Campos entre aspas com quebra de linha (inclusive \r\n) e linhas em branco entre registros
+CSV_INPUT = (
+    'id,name,str,int,primary_element,secondary_element,guild_level\r\n'
+    '1,"Linha\nquebrada",40,5,Fire,Wind,0\r\n'
+    '\r\n'
+    '2,simples,12,20,Water,Earth,3\r\n'
+    '3,"duas\r\nquebras\n",300,5,Fire,Wind,0\r\n'
+    '4,"vírgula, ""aspas""",5,5,Fire,Fire,0\r\n'
+    '\r\n'
+    '\r\n'
+    '5,"fim\n",30,30,Lightning,Medical,10\r\n'
+)
+EXPECTED_ERRORS = {"3", "4"}  # STR acima do máximo; elementos iguais (nos dois, nomes com aspas)
+
+
+def _run(text, fmt, **kwargs):
+    out = io.StringIO()
+    total, errors = run(io.StringIO(text, newline=""), out, fmt, fmt, **kwargs)
+    return out.getvalue(), total, errors
+
+
+def _csv_rows(text):
+    return list(csv.DictReader(io.StringIO(text, newline="")))
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 4, 1000])
+def test_csv_chunks_keep_quoted_newlines_and_row_numbers(chunk_size):
+    text, total, errors = _run(CSV_INPUT, "csv", chunk_size=chunk_size)
+    rows = _csv_rows(text)
+    assert (total, errors) == (5, 2)
+    assert [row["row"] for row in rows] == ["1", "2", "3", "4", "5"]
+    assert [row["id"] for row in rows if not row["error"]] == ["1", "2", "5"]
+    assert rows[0]["name"] == "Linha\nquebrada"
+    assert rows[4]["name"] == "fim\n"
+    assert {row["row"] for row in rows if row["error"]} == EXPECTED_ERRORS
+    assert rows[1]["STR"] == "12" and rows[1]["INT"] == "20"
+    # O resultado não depende do tamanho do lote
+    assert text == _run(CSV_INPUT, "csv", chunk_size=1000)[0]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 1000])
+def test_read_chunks_splits_by_record(chunk_size):
+    header, chunks = read_chunks(io.StringIO(CSV_INPUT, newline=""), "csv", chunk_size)
+    chunks = list(chunks)
+    assert header[:2] == ["id", "name"]
+    assert [start for start, _ in chunks] == list(range(1, 6, chunk_size))
+    records = [record for _, batch in chunks for record in batch]
+    assert [record[0] for record in records] == ["1", "2", "3", "4", "5"]
+    assert [record[1] for record in records] == ["Linha\nquebrada", "simples", "duas\r\nquebras\n",
+                                                 'vírgula, "aspas"', "fim\n"]
+
+
+def test_jsonl_row_numbers_skip_blank_lines():
+    lines = [json.dumps({"id": 1, "primary": "Fire", "secondary": "Wind"}), "", "   ",
+             "não é json", json.dumps([1, 2]), json.dumps({"id": 4, "primary": "Fire"}),
+             json.dumps({"id": 5, "primary": "Water", "secondary": "Earth", "STR": 40})]
+    text, total, errors = _run("\n".join(lines) + "\n", "jsonl", chunk_size=2)
+    results = [json.loads(line) for line in text.splitlines()]
+    assert (total, errors) == (5, 3)
+    assert [r["row"] for r in results] == [1, 2, 3, 4, 5]
+    assert ["error" in r for r in results] == [False, True, True, True, False]
+    assert results[3]["error"] == "campo obrigatório ausente: secondary"
+    assert results[4]["attributes"]["STR"] == 40
+
+
+def test_workers_match_single_process():
+    single = _run(CSV_INPUT, "csv", chunk_size=2)
+    assert _run(CSV_INPUT, "csv", chunk_size=2, workers=2) == single
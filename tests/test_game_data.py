@@ -0,0 +1,49 @@
+import os
+import shutil
+
+import pytest
+
+import game_data
+from game_data import GameDataError, load_error, load_game_data
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    version = game_data.default_version()
+    shutil.copy(os.path.join(game_data.DATA_DIR, f"{version}.json"), tmp_path)
+    monkeypatch.setattr(game_data, "DATA_DIR", str(tmp_path))
+    game_data.clear()
+    yield tmp_path, version
+    game_data.clear()
+
+
+def _rewrite(path, text):
+    # mtime_ns distinto garante a releitura mesmo em sistemas de arquivos com relógio grosso
+    mtime = os.stat(path).st_mtime_ns
+    path.write_text(text, encoding="utf-8")
+    os.utime(path, ns=(mtime + 1_000_000, mtime + 1_000_000))
+
+
+@pytest.mark.parametrize("broken", [lambda text: text[:len(text) // 2], lambda text: "[]",
+                                    lambda text: text.replace('"techniques"', '"tecnicas"', 1)])
+def test_broken_edit_keeps_last_good_data(data_dir, broken):
+    tmp_path, version = data_dir
+    path = tmp_path / f"{version}.json"
+    good = load_game_data(version)
+    original = path.read_text(encoding="utf-8")
+
+    _rewrite(path, broken(original))
+    assert load_game_data(version) is good
+    assert load_game_data(version) is good
+    assert load_error(version)
+
+    _rewrite(path, original)
+    assert load_game_data(version) is good
+    assert load_error(version) is None
+
+
+def test_broken_file_without_good_load_raises(data_dir):
+    tmp_path, version = data_dir
+    _rewrite(tmp_path / f"{version}.json", "{")
+    with pytest.raises(GameDataError, match="JSON inválido"):
+        load_game_data(version)
@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+
+from engine import ATTRIBUTES, BASE_MIN, MAX_POINTS, apply_bonuses, final_attributes_array, load_game_data
+
+GUILD_LEVELS = range(11)
+SAMPLES = 48  # bases sorteadas por combinação (charm, guild, facção)
+
+
+# Cópia congelada do apply_bonuses de antes do pipeline de modificadores (Metanin.py original).
+# Não atualizar junto com o engine: é a referência que o pipeline precisa reproduzir
+def apply_bonuses_reference(base, charm, guild_level, attr, faction_bonus):
+    value_with_guild = base * (1 + guild_level * 0.01)
+    charm_bonuses = {
+        "Capricorn": {"FRT": 5}, "Aquarius": {"INT": 5}, "Leo": {"AGI": 5},
+        "Saggitarius": {a: 1 for a in ["STR", "FRT", "INT", "AGI", "CHK"]},
+        "Virgo": {"CHK": 5}, "Cancer": {"STR": 1}, "Pisces": {a: 1 for a in ["STR", "FRT", "INT", "AGI", "CHK"]},
+        "Libra": {"INT": 0.05}, "Scorpio": {"AGI": 1}, "Gemini": {"CHK": 1}, "Taurus": {"FRT": 1}
+    }
+    bonus = charm_bonuses.get(charm, {}).get(attr, 0)
+    total_bonus = int(value_with_guild * (1 + bonus)) if isinstance(bonus, float) else int(value_with_guild + bonus)
+    return total_bonus + faction_bonus
+
+
+@pytest.fixture(scope="module")
+def data():
+    return load_game_data()
+
+
+def _reference_grid(bases, charm, guild_level, faction_bonus):
+    return np.array([[apply_bonuses_reference(int(b), charm, guild_level, attr, faction_bonus)
+                      for b, attr in zip(row, ATTRIBUTES)] for row in bases])
+
+
+def _random_bases(rng, n):
+    # Atributos base entre o mínimo e o máximo de um único atributo, mais os extremos
+    bases = rng.integers(BASE_MIN, BASE_MIN + MAX_POINTS + 1, size=(n, len(ATTRIBUTES)))
+    bases[0], bases[-1] = BASE_MIN, BASE_MIN + MAX_POINTS
+    return bases
+
+
+@pytest.mark.parametrize("charm", load_game_data().charms)
+def test_pipeline_matches_reference(data, charm):
+    rng = np.random.default_rng(data.charm_codes[charm])
+    for guild_level in GUILD_LEVELS:
+        for faction_bonus in data.faction_bonuses.values():
+            bases = _random_bases(rng, SAMPLES)
+            expected = _reference_grid(bases, charm, guild_level, faction_bonus)
+
+            scalar = np.array([[apply_bonuses(int(b), charm, guild_level, attr, faction_bonus, data)
+                                for b, attr in zip(row, ATTRIBUTES)] for row in bases])
+            batch = final_attributes_array(bases, data.charm_codes[charm], guild_level, faction_bonus, data)
+            np.testing.assert_array_equal(scalar, expected)
+            np.testing.assert_array_equal(batch, expected)
+
+
+def test_batch_with_mixed_selections(data):
+    # Um lote com charm, guild e facção diferentes por linha, como em evaluate_builds
+    rng = np.random.default_rng(0)
+    n = 4096
+    bases = _random_bases(rng, n)
+    charms = rng.choice(data.charms, size=n)
+    guilds = rng.integers(0, 11, size=n)
+    factions = rng.choice(list(data.faction_bonuses.values()), size=n)
+
+    expected = np.array([[apply_bonuses_reference(int(b), c, int(g), attr, int(f))
+                          for b, attr in zip(row, ATTRIBUTES)]
+                         for row, c, g, f in zip(bases, charms, guilds, factions)])
+    codes = np.array([data.charm_codes[c] for c in charms])
+    np.testing.assert_array_equal(final_attributes_array(bases, codes, guilds, factions, data), expected)
+
+
+def test_libra_truncation(data):
+    # Libra é o único multiplicador: int() depois de guild e charm, em toda base de INT possível
+    bases = np.arange(BASE_MIN, BASE_MIN + MAX_POINTS + 1)
+    grid = np.repeat(bases[:, None], len(ATTRIBUTES), axis=1)
+    for guild_level in GUILD_LEVELS:
+        for faction_bonus in data.faction_bonuses.values():
+            expected = [apply_bonuses_reference(int(b), "Libra", guild_level, "INT", faction_bonus) for b in bases]
+            scalar = [apply_bonuses(int(b), "Libra", guild_level, "INT", faction_bonus, data) for b in bases]
+            batch = final_attributes_array(grid, data.charm_codes["Libra"], guild_level, faction_bonus, data)
+            assert scalar == expected
+            np.testing.assert_array_equal(batch[:, ATTRIBUTES.index("INT")], expected)
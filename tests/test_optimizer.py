@@ -0,0 +1,69 @@
+import itertools
+from functools import lru_cache
+
+import numpy as np
+import pytest
+
+from engine import ATTRIBUTES, BASE_MIN, evaluate_builds
+from game_data import load_game_data
+from optimizer import OBJECTIVES, optimize_builds
+
+DATA = load_game_data()
+BUDGETS = [0, 3, 9, 14]
+
+
+@lru_cache(maxsize=None)
+def _allocations(budget):
+    # Todas as distribuições de até `budget` pontos nos cinco atributos (sem gastar tudo, inclusive)
+    return tuple(dict(zip(ATTRIBUTES, (BASE_MIN + p for p in points)))
+                 for points in itertools.product(range(budget + 1), repeat=len(ATTRIBUTES)) if sum(points) <= budget)
+
+
+def _exhaustive_best(primary, secondary, charm, guild, faction, objective, weapon, require_weapon,
+                     include_common, budget):
+    configs = [{**base, "primary": primary, "secondary": secondary, "charm": charm, "guild_level": guild,
+                "faction": faction, "weapon": weapon} for base in _allocations(budget)]
+    batch = evaluate_builds(configs, include_common=include_common, data=DATA)
+    if objective == "weapon":
+        scores = batch.weapon_damage
+    elif objective == "tech":
+        scores = np.nanmax(batch.tech_damage, axis=1)
+    else:
+        scores = np.nansum(batch.tech_dps, axis=1)
+    if require_weapon:
+        scores = np.where(batch.meets_requirements, scores, -np.inf)
+    return scores.max()
+
+
+CASES = [
+    ("Fire", "Wind", "Nenhum", 0, "Nenhuma", "dps", None, False, False),
+    ("Water", "Earth", "Nenhum", 10, "Nenhuma", "tech", None, False, True),
+    ("Lightning", "Medical", "Nenhum", 5, "Nenhuma", "dps", "Kunai Dagger", True, False),
+    ("Fire", "Taijutsu", "Nenhum", 0, "Nenhuma", "weapon", "Wooden Katana", True, False),
+    ("Fire", "Wind", "Nenhum", 3, "Nenhuma", "weapon", "Kunai Dagger", False, True),
+]
+# Todos os charms e facções dos dados, num caso de DPS com arma exigida
+CASES += [("Fire", "Lightning", charm, 7, faction, "dps", "Wooden Katana", True, True)
+          for charm in DATA.charm_bonuses for faction in DATA.faction_bonuses]
+
+
+@pytest.mark.parametrize("budget", BUDGETS)
+@pytest.mark.parametrize("case", CASES)
+def test_optimizer_matches_exhaustive_search(case, budget):
+    primary, secondary, charm, guild, faction, objective, weapon, require_weapon, include_common = case
+    results = optimize_builds(primary, secondary, charm, guild, DATA.faction_bonuses[faction], objective=objective,
+                              weapon=weapon, require_weapon=require_weapon, include_common=include_common,
+                              points=budget, top_n=5, data=DATA)
+    best = _exhaustive_best(primary, secondary, charm, guild, faction, objective, weapon, require_weapon,
+                            include_common, budget)
+    if not np.isfinite(best):
+        assert results == []
+        return
+    assert results
+    label = OBJECTIVES[objective]
+    assert results[0][label] == pytest.approx(best)
+    scores = [row[label] for row in results]
+    assert scores == sorted(scores, reverse=True)
+    for row in results:
+        assert row["Pontos Gastos"] <= budget
+        assert all(row[attr] >= BASE_MIN for attr in ATTRIBUTES)
@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+from pareto import pareto_front
+
+
+def pareto_front_reference(points):
+    # Definição direta, O(n²): fica quem ninguém domina (>= em tudo e diferente), uma vez por vetor
+    points = np.asarray(points, dtype=np.float64)
+    front = []
+    for i, p in enumerate(points):
+        dominated = ((points >= p).all(axis=1) & (points != p).any(axis=1)).any()
+        first = (points[:i] == p).all(axis=1).any()
+        if not dominated and not first:
+            front.append(i)
+    return np.array(front, dtype=np.int64)
+
+
+@pytest.mark.parametrize("dims", [2, 3, 4])
+@pytest.mark.parametrize("seed", range(5))
+def test_pareto_front_matches_pairwise_dominance(dims, seed):
+    rng = np.random.default_rng(seed)
+    # Valores inteiros pequenos geram empates e cópias; 700 linhas cruzam vários blocos de BLOCK_ROWS
+    for rows, high in ((1, 3), (20, 3), (700, 6), (700, 1000)):
+        points = rng.integers(0, high, size=(rows, dims))
+        np.testing.assert_array_equal(pareto_front(points), pareto_front_reference(points))
+
+
+@pytest.mark.parametrize("dims", [2, 3])
+def test_pareto_front_of_anticorrelated_points(dims):
+    # Pontos sobre o simplex: quase todos estão na fronteira
+    rng = np.random.default_rng(0)
+    points = rng.dirichlet(np.ones(dims), size=500).round(2)
+    np.testing.assert_array_equal(pareto_front(points), pareto_front_reference(points))
+
+
+def test_pareto_front_empty():
+    assert len(pareto_front(np.empty((0, 3)))) == 0
@@ -0,0 +1,77 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from engine import ATTRIBUTES, BASE_MIN, MAX_BASE, apply_bonuses, final_attributes, requirement_checks
+from game_data import DATA_DIR, GameData, default_version, load_game_data
+from requirements import IMPOSSIBLE, RequirementIndex, min_bases, solve_requirements
+
+DATA = load_game_data()
+SELECTIONS = [(charm, guild, faction) for charm in DATA.charm_bonuses
+              for guild in (0, 4, 10) for faction in DATA.faction_bonuses]
+
+
+def _synthetic_data(weapons=300, seed=0):
+    # Os dados reais têm poucas armas; para o índice, uma cópia com armas de requisitos aleatórios
+    with open(os.path.join(DATA_DIR, f"{default_version()}.json"), encoding="utf-8") as f:
+        raw = json.load(f)
+    rng = np.random.default_rng(seed)
+    raw["weapons"] = {}
+    for i in range(weapons):
+        attrs = rng.choice(ATTRIBUTES, size=rng.integers(0, 4), replace=False)
+        raw["weapons"][f"Arma {i}"] = {
+            "base_damage": 1, "scaling": "STR",
+            "requirements": {str(attr): int(rng.integers(1, 320)) for attr in attrs},
+        }
+    return GameData(raw, f"sintetico-{seed}")
+
+
+def _final(base, charm, guild, faction):
+    return final_attributes(base, charm, guild, DATA.faction_bonuses[faction], DATA)
+
+
+@pytest.mark.parametrize("charm,guild,faction", SELECTIONS)
+def test_min_bases_is_smallest_base_reaching_requirement(charm, guild, faction):
+    # Varredura completa das bases: a primeira que atinge cada valor exigido
+    bonus = DATA.faction_bonuses[faction]
+    finals = np.array([[apply_bonuses(b, charm, guild, attr, bonus, DATA) for b in range(BASE_MIN, MAX_BASE + 1)]
+                       for attr in ATTRIBUTES])
+    required = np.arange(0, int(finals.max()) + 3)
+    solved = min_bases(np.repeat(required[:, None], len(ATTRIBUTES), axis=1), charm, guild, bonus, DATA)
+    for j in range(len(ATTRIBUTES)):
+        reached = finals[j][:, None] >= required
+        expected = np.where(reached.any(axis=0), reached.argmax(axis=0) + BASE_MIN, IMPOSSIBLE)
+        np.testing.assert_array_equal(solved[:, j], expected)
+
+
+@pytest.mark.parametrize("charm,guild,faction", SELECTIONS)
+@pytest.mark.parametrize("start", [None, {"STR": 30, "INT": 7}, {attr: 60 for attr in ATTRIBUTES}])
+def test_solve_requirements_is_minimal(charm, guild, faction, start):
+    for weapon, weapon_data in DATA.weapons_db.items():
+        result = solve_requirements(weapon, charm, guild, faction, start, DATA)
+        base = result["base"]
+        assert all(requirement_checks(weapon_data, _final(base, charm, guild, faction)).values())
+        current = {attr: (start or {}).get(attr, BASE_MIN) for attr in ATTRIBUTES}
+        assert all(base[attr] >= current[attr] for attr in ATTRIBUTES)
+        assert result["extra_points"] == sum(base[attr] - current[attr] for attr in ATTRIBUTES)
+        # Minimal: tirar um ponto de qualquer atributo que subiu deixa de equipar a arma
+        for attr in ATTRIBUTES:
+            if base[attr] > current[attr]:
+                lower = {**base, attr: base[attr] - 1}
+                assert not all(requirement_checks(weapon_data, _final(lower, charm, guild, faction)).values())
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_eligible_matches_full_scan(seed):
+    data = _synthetic_data(seed=seed)
+    index = RequirementIndex(data)
+    rng = np.random.default_rng(seed)
+    for vector in rng.integers(0, 330, size=(300, len(ATTRIBUTES))):
+        attributes = dict(zip(ATTRIBUTES, vector.tolist()))
+        expected = tuple(name for name, weapon in data.weapons_db.items()
+                         if all(requirement_checks(weapon, attributes).values()))
+        assert index.eligible(attributes) == expected
+        assert index.eligible(vector) == expected
+        assert index.count(attributes) == len(expected)
@@ -0,0 +1,49 @@
+import itertools
+
+import pytest
+
+from engine import ATTRIBUTES, BASE_MIN
+from game_data import load_game_data
+from rotation import loadout_indices, simulate_rotation
+
+DATA = load_game_data()
+
+BUILDS = [
+    {"STR": 200, "INT": BASE_MIN},
+    {"INT": 200},
+    {"STR": 100, "INT": 100},
+    {"STR": 40, "FRT": 40, "INT": 40, "AGI": 40},
+    {"STR": 60, "INT": 60, "CHK": 120},
+    {"STR": 200, "CHK": 200},
+    {},
+]
+
+
+def _attributes(build):
+    return {a: build.get(a, BASE_MIN) for a in ATTRIBUTES}
+
+
+def _dps(build, elements, weapon, **kwargs):
+    attributes = _attributes(build)
+    loadout = loadout_indices(*elements, data=DATA) if elements else []
+    return simulate_rotation(attributes, loadout, weapon=weapon, data=DATA, **kwargs)["sustained_dps"]
+
+
+@pytest.mark.parametrize("weapon", list(DATA.weapons_db))
+@pytest.mark.parametrize("elements", list(itertools.permutations(DATA.elements, 2)))
+def test_rotation_never_below_weapon_only(elements, weapon):
+    for build in BUILDS:
+        assert _dps(build, elements, weapon) >= _dps(build, None, weapon) - 1e-9, build
+
+
+def test_weak_techniques_lose_to_weapon_hit():
+    # STR 200 com Wooden Katana: o hit da arma bate mais que as técnicas de Fire/Lightning com INT baixo
+    build = {"STR": 200}
+    assert _dps(build, ("Fire", "Lightning"), "Wooden Katana") >= _dps(build, None, "Wooden Katana")
+
+
+def test_charging_only_when_it_pays():
+    build = {"STR": 100, "INT": 100}
+    charged = _dps(build, ("Fire", "Wind"), "Wooden Katana")
+    assert charged >= _dps(build, ("Fire", "Wind"), "Wooden Katana", charge_restore=0)
+    assert charged >= _dps(build, None, "Wooden Katana")